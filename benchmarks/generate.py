@@ -0,0 +1,116 @@
+"""
+Generator data sintetis untuk benchmark:
+- export IRIS tab-separated 31 kolom (layout yang dibaca parse_txt_file),
+  termasuk field IP/URL multiline dalam tanda kutip;
+- export offense QRadar (<OffenseForm>) untuk xml_to_excel.
+
+Contoh:
+    python benchmarks/generate.py txt 100000 /tmp/iris_100k.txt
+    python benchmarks/generate.py xml 100000 /tmp/offense_100k.xml
+"""
+import csv
+import os
+import random
+import sys
+from xml.sax.saxutils import escape
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+EVENT_TYPES = ["Offensess", "Log Activity"]
+COUNTRIES = ["Indonesia", "United States", "China", "Singapore", "Russia", "Netherlands", "Germany"]
+PORTS = ["22", "53", "80", "443", "445", "3389", "8080", "11211"]
+UNKNOWN_EVENTS = ["Custom Rule Vendor X", "Suspicious Beacon (Internal)", "New Signature 2026-10"]
+
+
+def load_event_pool(root=ROOT):
+    """Nama event: yang punya template (dirender), dari database, dan beberapa unknown."""
+    templated = [
+        name[:-4] for name in os.listdir(os.path.join(root, "templates"))
+        if name.endswith(".txt") and name not in ("wa.txt", "Tamplate.txt")
+    ]
+    with open(os.path.join(root, "database", "events_magnitude_list.csv"), newline="", encoding="utf-8") as f:
+        database = [row["Event Name"].strip() for row in csv.DictReader(f) if row.get("Event Name")]
+    return templated, database
+
+
+def random_ip(rng):
+    return f"{rng.choice((10, 36, 103, 172, 192, 202))}.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}"
+
+
+def multiline(rng, make, max_items=3):
+    """Sebagian besar 1 nilai, sebagian multiline (akan ditulis berkutip oleh csv)."""
+    return "\n".join(make() for _ in range(rng.randint(1, max_items)))
+
+
+def iris_rows(count, seed=0):
+    rng = random.Random(seed)
+    templated, database = load_event_pool()
+    for i in range(count):
+        roll = rng.random()
+        # folder templates/ atau database kosong → pakai sumber nama berikutnya
+        if roll < 0.6 and templated:
+            event_name = rng.choice(templated)
+        elif roll < 0.95 and database:
+            event_name = rng.choice(database)
+        else:
+            event_name = rng.choice(UNKNOWN_EVENTS)
+
+        hour, minute = rng.randrange(24), rng.randrange(60)
+        yield [
+            str(i + 1), f"analyst{rng.randrange(12)}", f"IRIS-{i // 2 + 100000}", rng.choice(EVENT_TYPES),
+            "Closed", "No", "-", event_name, str(rng.randint(1, 10)),
+            "17/10/2026", f"{hour:02d}:{minute:02d}", "17/10/2026", f"{hour:02d}:{minute:02d}", "5",
+            "17/10/2026", f"{hour:02d}:{minute:02d}", "10", "Blocked", "Closed", "Inbound",
+            multiline(rng, lambda: random_ip(rng)),
+            multiline(rng, lambda: rng.choice(COUNTRIES), 2),
+            multiline(rng, lambda: random_ip(rng)),
+            multiline(rng, lambda: rng.choice(PORTS), 2),
+            rng.choice(COUNTRIES), "HTTP", "Mozilla/5.0 (X11; Linux x86_64)", "web01",
+            multiline(rng, lambda: f"http://example{rng.randrange(50)}.test/path/{rng.randrange(1000)}", 2),
+            "id=1' OR '1'='1" if rng.random() < 0.1 else "-",
+            "-",
+        ]
+
+
+def generate_iris_txt(path, count, seed=0):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter="\t", quotechar='"', lineterminator="\r\n")
+        writer.writerows(iris_rows(count, seed))
+    return path
+
+
+def generate_offense_xml(path, count, seed=0):
+    from main import OFFENSE_COLUMNS
+
+    rng = random.Random(seed)
+    _, database = load_event_pool()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<OffenseList>\n')
+        for i in range(count):
+            values = {
+                "id": str(50000 + i),
+                "magnitude": str(rng.randint(1, 10)),
+                "closeUser": f"analyst{rng.randrange(12)}",
+                "formattedClosedDate": f"17 Oct 2026 {rng.randrange(24):02d}:{rng.randrange(60):02d}:00",
+                "localizedCloseReason": "False-Positive, Tuned" if rng.random() < 0.3 else "Non-Issue",
+                "description": rng.choice(database),
+                "attacker": random_ip(rng),
+                "target": random_ip(rng),
+            }
+            f.write("<OffenseForm>")
+            for column in OFFENSE_COLUMNS:
+                value = values.get(column, f"{column}-{rng.randrange(1000)}")
+                f.write(f"<{column}>{escape(value)}</{column}>")
+            f.write("</OffenseForm>\n")
+        f.write("</OffenseList>\n")
+    return path
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] not in ("txt", "xml"):
+        print(__doc__)
+        sys.exit(1)
+    sys.path.insert(0, ROOT)
+    kind, count, out = sys.argv[1], int(sys.argv[2]), sys.argv[3]
+    (generate_iris_txt if kind == "txt" else generate_offense_xml)(out, count)
+    print(out)
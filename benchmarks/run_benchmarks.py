@@ -0,0 +1,187 @@
+"""
+Benchmark throughput tool SOC dengan data sintetis.
+
+Setiap kombinasi (scenario, jumlah baris) dijalankan di subprocess terpisah
+supaya waktu dan peak RSS tidak saling mempengaruhi. Hasil ditulis sebagai
+JSON agar bisa dibandingkan antar versi.
+
+Contoh:
+    python benchmarks/run_benchmarks.py                       # semua scenario, 10k/100k/1M
+    python benchmarks/run_benchmarks.py -s parse fill_template --sizes 10000 100000
+    python benchmarks/run_benchmarks.py -o bench_results.json --workers 16
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ROOT, "benchmarks", ".data")
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+RENDER_SAMPLE = 10_000  # fill_template: render ulang sampel event sebanyak N kali
+
+
+def dataset(kind, rows):
+    """Path data sintetis (di-cache di benchmarks/.data supaya tidak dibuat ulang)."""
+    from benchmarks.generate import generate_iris_txt, generate_offense_xml
+
+    os.makedirs(DATA_DIR, exist_ok=True)
+    path = os.path.join(DATA_DIR, f"{kind}_{rows}.{kind}")
+    if not os.path.exists(path):
+        tmp_path = path + ".tmp"
+        (generate_iris_txt if kind == "txt" else generate_offense_xml)(tmp_path, rows)
+        os.replace(tmp_path, path)
+    return path
+
+
+# ==================== SCENARIO ====================
+class SkipScenario(Exception):
+    """Scenario tidak bisa diukur dengan data ini (dilaporkan sebagai skipped, bukan error)."""
+
+
+def bench_parse(main, rows, args):
+    main.drain(main.iter_txt_file(dataset("txt", rows)))
+
+
+def bench_fill_template(main, rows, args):
+    events = []
+    for event in main.iter_txt_file(dataset("txt", min(rows, RENDER_SAMPLE))):
+        template = main.template_cache.get(event["event_name"])
+        if template is not None:
+            events.append((template, event))
+    if not events:
+        raise SkipScenario("tidak ada event sampel yang punya template di templates/")
+    mag_map = main.load_event_magnitudes(main.EVENT_DB_FILE)
+
+    start = time.perf_counter()
+    for i in range(rows):
+        template, event = events[i % len(events)]
+        main.fill_template(template, event, mag_map)
+    return time.perf_counter() - start
+
+
+def bench_write_event_details(main, rows, args):
+    mag_map = main.load_event_magnitudes(main.EVENT_DB_FILE)
+    main.write_event_details(main.iter_txt_file(dataset("txt", rows)), "1", mag_map, args.workers)
+
+
+def bench_fp_summary(main, rows, args):
+    index = main.build_event_index(main.load_false_positive())
+    main.print_false_positive_summary(main.iter_txt_file(dataset("txt", rows)), index)
+
+
+def bench_xml_to_excel(main, rows, args):
+    main.xml_to_excel(dataset("xml", rows), "1", args.format)
+
+
+SCENARIOS = {
+    "parse": bench_parse,
+    "fill_template": bench_fill_template,
+    "write_event_details": bench_write_event_details,
+    "fp_summary": bench_fp_summary,
+    "xml_to_excel": bench_xml_to_excel,
+}
+
+
+def run_one(scenario, rows, args):
+    """Dijalankan di subprocess: siapkan data, ukur satu scenario, cetak JSON."""
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    import main
+
+    kind = "xml" if scenario == "xml_to_excel" else "txt"
+    if scenario != "fill_template":
+        dataset(kind, rows)  # pembuatan data tidak ikut diukur
+
+    with tempfile.TemporaryDirectory(prefix="soc-bench-") as out_dir:
+        main.OUTPUT_DIR = out_dir
+        with open(os.devnull, "w") as devnull:
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                start = time.perf_counter()
+                measured = SCENARIOS[scenario](main, rows, args)
+                seconds = measured if measured is not None else time.perf_counter() - start
+            except SkipScenario as e:
+                print(json.dumps({"scenario": scenario, "rows": rows, "skipped": str(e)}), file=stdout)
+                return
+            finally:
+                sys.stdout = stdout
+
+    result = {
+        "scenario": scenario,
+        "rows": rows,
+        "seconds": round(seconds, 4),
+        "rows_per_sec": round(rows / seconds, 1) if seconds else 0.0,
+    }
+    try:
+        import resource
+        # Linux: KiB, macOS: byte
+        scale = 1 if sys.platform == "darwin" else 1024
+        result["max_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2**20, 1)
+    except ImportError:
+        pass
+    print(json.dumps(result))
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark throughput SOC Event Processing Tool")
+    parser.add_argument("-s", "--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES)
+    parser.add_argument("-w", "--workers", type=int, default=8, help="worker write_event_details")
+    parser.add_argument("-f", "--format", default="xlsx", help="format export xml_to_excel")
+    parser.add_argument("-o", "--output", default="bench_results.json")
+    parser.add_argument("--run-one", nargs=2, metavar=("SCENARIO", "ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        run_one(args.run_one[0], int(args.run_one[1]), args)
+        return
+
+    results = []
+    for scenario in args.scenarios:
+        for rows in args.sizes:
+            cmd = [sys.executable, os.path.abspath(__file__), "--run-one", scenario, str(rows),
+                   "--workers", str(args.workers), "--format", args.format]
+            proc = subprocess.run(cmd, capture_output=True, text=True)
+            if proc.returncode != 0:
+                print(f"[ERROR] {scenario} {rows}: {proc.stderr.strip().splitlines()[-1:]}")
+                results.append({"scenario": scenario, "rows": rows, "error": proc.stderr.strip()[-2000:]})
+                continue
+            result = json.loads(proc.stdout.strip().splitlines()[-1])
+            results.append(result)
+            if "skipped" in result:
+                print(f"[INFO] {scenario} {rows}: dilewati, {result['skipped']}")
+                continue
+            print(f"[OK] {scenario:<20} {rows:>9} baris  {result['seconds']:>9.3f} s  "
+                  f"{result['rows_per_sec']:>12,.0f} baris/s  {result.get('max_rss_mb', '-')} MB")
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "workers": args.workers,
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"[INFO] Hasil benchmark tersimpan di {args.output}")
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, ROOT)
+    main()
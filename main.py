@@ -1,23 +1,51 @@
 import os
 import sys
-import shutil
 import glob
 import csv
-import difflib
-import re
-import xml.etree.ElementTree as ET
-import pandas as pd
+import argparse
+import hashlib
+import json
+import time
 from pathlib import Path
-from datetime import datetime
-from collections import Counter
-from rich.console import Console
-from rich.prompt import Prompt
-from rich.table import Table
-
-console = Console()
+from datetime import datetime, timedelta
+from collections import Counter, deque
+from contextlib import nullcontext
+from utils.template_engine import TemplateCache, compile_template
+from utils.event_index import EventIndex, normalize
+from utils.offense_export import (EXPORT_FORMATS, ExportDependencyError, dependency_message, export_offenses,
+                                  missing_dependency)
+from parser.records import read_appended_records
+from parser.event_record import EventRecord
+from parser.log_parser import MIN_COLUMNS, iter_file_rows, read_layout
+from parser.parallel import iter_parallel_chunks
+from utils.manifest import RenderManifest
+from utils import metrics
+from utils.shift_stats import ShiftStats
+from utils.db_cache import FileCache, file_stamp
+from utils import event_db
+from utils.template_feed import read_template_feed
+
+# Dependency berat (pandas, rich, ElementTree, thread pool, sqlite3 lewat
+# event_store / dedup_index, zipfile lewat report_bundle, socket lewat
+# ip_enrich / fp_rules, shutil lewat shift_rotation) di-import di dalam
+# fungsi yang memakainya, supaya mode ringan via CLI bisa start dalam hitungan ms.
+class _LazyConsole:
+    """Proxy rich Console: rich baru di-import saat console pertama kali dipakai."""
+    _console = None
+
+    def __getattr__(self, name):
+        if _LazyConsole._console is None:
+            from rich.console import Console
+            _LazyConsole._console = Console()
+        return getattr(_LazyConsole._console, name)
+
+console = _LazyConsole()
 
 # ==================== MENU UTAMA ====================
 def main_menu():
+    from rich.prompt import Prompt
+    from rich.table import Table
+
     console.print("[bold cyan]==============| MENU UTAMA |==============[/bold cyan]\n")
     console.print("1. Proses [green]file txt[/green] → WA Report")
     console.print("2. Proses [yellow]file txt[/yellow] → Event Report")
@@ -25,17 +53,18 @@ def main_menu():
     console.print("4. Buat [magenta]Template Event[/magenta]")
     console.print("5. Cek [magenta]False Positive[/magenta] Event")
     console.print("6. [green]Tambah Event ke Database[/green]")
+    console.print("7. [cyan]Watch[/cyan] folder input (real-time)")
 
     console.print("99. [red]Exit[/red]\n")
 
     mode = Prompt.ask(
         "[bold white]Pilih mode[/bold white]",
-        choices=["1", "2", "3", "4", "5","6", "99"],
+        choices=["1", "2", "3", "4", "5","6", "7", "99"],
         default="1"
     )
     console.print(f"\n[cyan]>> Mode dipilih:[/cyan] {mode}\n")
 
-    if mode in ["1", "2", "3"]:
+    if mode in ["1", "2", "3", "7"]:
         table = Table(title="Daftar Shift", show_header=True, header_style="bold magenta")
         table.add_column("Kode", justify="center", style="cyan")
         table.add_column("Nama Shift", justify="center", style="green")
@@ -70,7 +99,56 @@ MAGENTA = "\033[95m"
 RESET = "\033[0m"
 
 TEMPLATE_DIR = "templates"
+BASE_TEMPLATE_FILE = os.path.join(TEMPLATE_DIR, "Tamplate.txt")  # kerangka template event (mode 4)
+INPUT_DIR = "input"
 OUTPUT_DIR = "outputs"
+EVENT_DB_FILE = os.path.join("database", "events_magnitude_list.csv")
+FP_FILE = os.path.join("database", "False_Positive.txt")
+# Rule FP per event (nama/glob + CIDR, port, regex URL/query), lihat README
+FP_RULES_FILE = os.path.join("database", "fp_rules.txt")
+
+template_cache = TemplateCache(TEMPLATE_DIR)
+# Hasil parse file database/ (event, FP, rule FP, tabel IP), di-parse ulang hanya kalau file berubah
+db_cache = FileCache()
+
+# Manifest rebuild incremental mode 2, disimpan di dalam folder shift
+MANIFEST_FILE = ".manifest.json"
+
+# Run report (JSON) per mode ditulis ke outputs/metrics/; isi path ini untuk
+# juga menulis Prometheus textfile (mis. untuk node_exporter textfile collector)
+METRICS_DIR = "metrics"
+METRICS_PROM_FILE = None
+STATS_TOP_N = 5
+SHIFT_RETENTION = 0  # jumlah generasi folder shift lama yang disimpan (.shiftN.gen-*)
+
+# Event store SQLite (event IRIS + offense QRadar lintas shift). Aktif kalau
+# USE_EVENT_STORE = True (CLI: --store); query lewat subcommand `query`.
+EVENT_STORE_FILE = os.path.join("database", "event_store.sqlite3")
+USE_EVENT_STORE = False
+
+# Index dedup lintas run/shift (opsional, --dedup): ticket (mode 1/2) dan
+# offense (mode 3) yang sudah dilaporkan shift lain dalam DEDUP_WINDOW_DAYS
+# terakhir dilewati
+DEDUP_FILE = os.path.join("database", "dedup_index.sqlite3")
+DEDUP_ENABLED = False
+DEDUP_WINDOW_DAYS = 7
+DEDUP_MAX_ENTRIES = 500_000
+
+# Enrichment IP offline dari tabel range format ip2asn (boleh .gz): placeholder
+# {src_geo}, {dst_geo}, {src_asn}, {dst_asn}, serta {src_country}/{dst_country}
+# kalau kolom export kosong. Tabel dimuat sekali, hanya kalau template memakainya.
+IP_TABLE_FILE = os.path.join("database", "ip2asn-combined.tsv")
+_ip_table_warned = False
+
+# Jumlah thread penulis file detail event di mode 2 (1 = sequential, log per event)
+WRITE_WORKERS = 8
+
+# Parse txt paralel di process pool (1 = sequential). Hanya dipakai kalau
+# total ukuran input minimal PARALLEL_MIN_BYTES; file dipecah per chunk
+# record sekitar PARSE_CHUNK_BYTES.
+PARSE_WORKERS = 1
+PARALLEL_MIN_BYTES = 64 * 1024 * 1024
+PARSE_CHUNK_BYTES = 32 * 1024 * 1024
 
 SHIFTS = {
     "3": ("Selamat Pagi", "00.00 - 08.00"),
@@ -78,6 +156,9 @@ SHIFTS = {
     "2": ("Selamat Malam", "16.00 - 00.00"),
 }
 
+# Rentang jam (awal, akhir) per shift, dipakai untuk mengambil event shift dari event store
+SHIFT_HOURS = {"3": (0, 8), "1": (8, 16), "2": (16, 24)}
+
 BULAN_MAP = {
     "Jan": "Januari", "Feb": "Februari", "Mar": "Maret", "Apr": "April",
     "May": "Mei", "Jun": "Juni", "Jul": "Juli", "Aug": "Agustus",
@@ -94,22 +175,39 @@ def get_default_shift():
     else:
         return "2"
 
+def shift_date(shift, now=None):
+    """
+    Tanggal logis shift: hari ketika window shift terakhir dimulai. Shift 2
+    (16.00 - 00.00) yang dijalankan ulang lewat tengah malam tetap memakai
+    tanggal kemarin, begitu juga shift lain yang belum dimulai hari ini.
+    """
+    now = now or datetime.now()
+    if now.hour < SHIFT_HOURS[shift][0]:
+        now -= timedelta(days=1)
+    return now.strftime("%Y-%m-%d")
+
 # ==================== LOAD CSV MAGNITUDE ====================
-def load_event_magnitudes(csv_file):
+def read_event_database(csv_file):
+    """Satu kali baca CSV database event → (tuple nama event, {nama: magnitude})."""
+    names = []
     mapping = {}
     try:
         with open(csv_file, newline='', encoding='utf-8') as f:
             reader = csv.DictReader(f)
             for row in reader:
+                event = (row.get("Event Name") or "").strip()
+                if event:
+                    names.append(event)
                 try:
-                    event = row["Event Name"].strip()
-                    magnitude = int(row["Magnitude"])
-                    mapping[event] = magnitude
+                    mapping[event] = int(row["Magnitude"])
                 except Exception:
                     continue
     except FileNotFoundError:
-        print(f"{RED}[WARNING]{RESET} File magnitude '{csv_file}' tidak ditemukan, lanjut tanpa mapping...")
-    return mapping
+        print(f"{RED}[WARNING]{RESET} File '{csv_file}' tidak ditemukan. Validasi event dan mapping magnitude dilewati.")
+    return tuple(names), mapping
+
+def load_event_magnitudes(csv_file=EVENT_DB_FILE):
+    return dict(db_cache.get(csv_file, read_event_database)[1])
 
 def categorize_magnitude(mag):
     if 1 <= mag <= 3:
@@ -120,92 +218,165 @@ def categorize_magnitude(mag):
         return "High"
     return "Unknown"
 
-# ==================== UTIL ====================
-def verticalize(raw):
-    if not raw or raw == "-":
-        return "-"
-    lines = [x.strip() for x in raw.splitlines() if x.strip()]
-    return "<br>\n".join(lines) + "<br>" if lines else "-"
-
 # ==================== FILE TXT ====================
-def parse_txt_file(file_path):
-    parsed_events = []
-    with open(file_path, newline='', encoding='utf-8') as f:
-        reader = csv.reader(f, delimiter='\t', quotechar='"')
-        for parts in reader:
-            if len(parts) <= 3:
+def iter_txt_file(file_path):
+    """Generator: yield satu event per baris tanpa menampung seluruh file di memori."""
+    yield from iter_txt_rows(iter_file_rows(file_path))
+
+def iter_txt_rows(rows):
+    """Ubah baris kolom (urutan kanonik, lihat parser.log_parser) menjadi EventRecord, baris pendek dilewati."""
+    parsed = skipped = 0
+    try:
+        for parts in rows:
+            if len(parts) < MIN_COLUMNS:
+                skipped += 1
                 continue
 
-            def get_part(idx):
-                return parts[idx].strip() if len(parts) > idx else ""
-
-            event = {
-                "event_id": get_part(0),           # NO
-                "analyst": get_part(1),            # AGENT NAME
-                "ticket_id": get_part(2),          # NO. TICKET IRIS
-                "event_type": get_part(3),         # OFFENSES TYPE
-                "reason_close": get_part(4),       # Reason Close Offense
-                "escalation": get_part(5),         # Escalation
-                "link_alert": get_part(6),         # Link Alert (khusus escalation)
-                "event_name": get_part(7),         # ALERT NAME
-                "magnitude": get_part(8),          # MAGNITUDE
-                "tanggal": get_part(9),            # DATE
-                "waktu": get_part(10),             # TIME
-                "ticket_date": get_part(11),       # TICKET DATE
-                "ticket_time": get_part(12),       # TICKET TIME
-                "soc_response_time": get_part(13), # SOC RESPONSE TIME
-                "user_date": get_part(14),         # USER DATE
-                "user_time": get_part(15),         # USER TIME
-                "user_response_time": get_part(16),# USER RESPONSE TIME
-                "action": get_part(17),            # ACTION
-                "event_status": get_part(18),      # EVENT STATUS
-                "traffic_flow": get_part(19),      # TRAFFIC FLOW
-                "src_ip": verticalize(get_part(20)),      # SRC IP
-                "src_country": verticalize(get_part(21)), # SRC COUNTRY
-                "dst_ip": verticalize(get_part(22)),      # DST IP
-                "dst_port": verticalize(get_part(23)),    # DST PORT
-                "dst_country": verticalize(get_part(24)), # DST COUNTRY
-                "app_access": get_part(25),        # SERVICE / APP ACCESS
-                "user_agent": get_part(26),        # USER AGENT
-                "request_server": get_part(27),    # REQUEST SERVER
-                "url": verticalize(get_part(28)),  # URL / DNS
-                "query": verticalize(get_part(29)),# REQUEST QUERY
-                "note": verticalize(get_part(30)), # NOTE
-            }
-            parsed_events.append(event)
-    return parsed_events
+            parsed += 1
+            yield EventRecord(parts)
+    finally:
+        metrics.current.count("rows_parsed", parsed)
+        metrics.current.count("rows_skipped", skipped)
+
+def parse_txt_file(file_path):
+    return list(iter_txt_file(file_path))
+
+def iter_txt_chunks(txt_files):
+    """
+    Yield (file txt, baris kolom) sesuai urutan file: satu per file, atau
+    satu per chunk record kalau parse paralel aktif (PARSE_WORKERS > 1 dan
+    input cukup besar). Hasil kedua jalur identik.
+    """
+    if PARSE_WORKERS > 1 and sum(os.path.getsize(f) for f in txt_files) >= PARALLEL_MIN_BYTES:
+        yield from iter_parallel_chunks(txt_files, PARSE_WORKERS, PARSE_CHUNK_BYTES)
+        return
+    for txt_file in txt_files:
+        yield txt_file, iter_file_rows(txt_file)
+
+def iter_txt_events(txt_files):
+    """Gabungkan semua file txt menjadi satu aliran event (satu kali baca)."""
+    for _, rows in iter_txt_chunks(txt_files):
+        yield from iter_txt_rows(rows)
+
+def iter_report_events(txt_files, shift, store=None, from_date=None):
+    """
+    Sumber event mode 1/2: file txt (disimpan juga ke event store kalau store
+    diberikan), atau — dengan from_date (YYYY-MM-DD) — event shift tersebut
+    langsung dari event store tanpa parse ulang export.
+    Waktu "parse" diukur pada sumber mentah, sebelum dibungkus stage store,
+    supaya waktu store tidak terhitung dua kali.
+    """
+    run = metrics.current
+    if from_date:
+        yield from run.timed_iter(
+            store.iter_events(date_from=from_date, date_to=from_date, hours=SHIFT_HOURS[shift]), "parse"
+        )
+        return
+    for txt_file, rows in run.timed_iter(iter_txt_chunks(txt_files), "parse"):
+        events = run.timed_iter(iter_txt_rows(rows), "parse")
+        if store is not None:
+            events = store.stage(events, shift, os.path.basename(txt_file))
+        yield from events
+
+def ticket_key(event_data):
+    """Key dedup ticket, sama dengan unique_key di event_details_stage (None kalau tanpa ticket id)."""
+    ticket_id = event_data.get("ticket_id", "").strip()
+    if not ticket_id:
+        return None
+    event_name = event_data.get("event_name", "").strip().strip('"')
+    return f"{event_name}_{ticket_id}_{event_data.get('event_type', '').strip()}"
+
+def open_dedup(shift, run_date=None):
+    """
+    DedupIndex untuk run (tanggal + shift) ini, atau nullcontext kalau dedup
+    dimatikan. Ditutup paling akhir supaya key baru hanya di-commit kalau
+    output run sudah berhasil di-swap.
+    """
+    if not DEDUP_ENABLED:
+        return nullcontext()
+    from utils.dedup_index import DedupIndex
+
+    run_id = f"{run_date or shift_date(shift)}-shift{shift}"
+    return DedupIndex(DEDUP_FILE, run_id, DEDUP_WINDOW_DAYS, DEDUP_MAX_ENTRIES)
+
+def store_has_events(shift, from_date):
+    """
+    Cek sebelum report --from-store dibangun: store harus sudah ada dan punya
+    event untuk tanggal + jam shift tersebut, supaya outputs/shiftN tidak
+    di-swap dengan report kosong (membuka store yang belum ada membuat file baru).
+    """
+    if not os.path.exists(EVENT_STORE_FILE):
+        print(f"{RED}[ERROR]{RESET} Event store '{EVENT_STORE_FILE}' belum ada, jalankan store-import atau --store dulu.")
+        return False
+    with open_event_store() as store:
+        count = store.count_events(date_from=from_date, date_to=from_date, hours=SHIFT_HOURS[shift])
+    if not count:
+        print(f"{RED}[ERROR]{RESET} Tidak ada event shift {shift} tanggal {from_date} di event store '{EVENT_STORE_FILE}'.")
+        return False
+    return True
+
+def open_event_store(enabled=True):
+    """EventStore sebagai context manager, atau nullcontext (store None) kalau tidak dipakai."""
+    if not enabled:
+        return nullcontext()
+    from utils.event_store import EventStore
+
+    return EventStore(EVENT_STORE_FILE)
+
+# ==================== STREAMING STAGE ====================
+# Setiap stage menerima iterable event, memproses satu per satu, lalu
+# meneruskannya (yield) ke stage berikutnya. Dengan begitu mode 1/2 cukup
+# membaca input sekali dan memori tetap datar berapa pun besar export-nya.
+def wa_count_stage(events, offenses_count, logs_count):
+    elapsed = 0.0
+    try:
+        for e in events:
+            start = time.perf_counter()
+            event_type = e["event_type"].strip()
+            if event_type == "Offensess":
+                offenses_count[e["event_name"]] += 1
+            elif event_type == "Log Activity":
+                logs_count[e["event_name"]] += 1
+            elapsed += time.perf_counter() - start
+            yield e
+    finally:
+        metrics.current.add_time("wa_count", elapsed)
+
+def drain(events):
+    for _ in events:
+        pass
 
 # ==================== CLEAN FOLDER ====================
-def clean_shift_folder(shift_key):
-    shift_outdir = os.path.join(OUTPUT_DIR, f"shift{shift_key}")
-    os.makedirs(shift_outdir, exist_ok=True)  # pastikan folder ada
+def shift_dir(shift_key):
+    return os.path.join(OUTPUT_DIR, f"shift{shift_key}")
 
-    for item in os.listdir(shift_outdir):
-        item_path = os.path.join(shift_outdir, item)
-        try:
-            if os.path.isfile(item_path) or os.path.islink(item_path):
-                os.unlink(item_path)
-                print(f"{GREEN}[OK]{RESET} File lama dihapus...")
-            elif os.path.isdir(item_path):
-                shutil.rmtree(item_path)
-                print(f"{GREEN}[OK]{RESET} Folder lama dihapus...")
-        except Exception as e:
-            print(f"{RED}[WARNING]{RESET} Gagal hapus {item_path}: {e}")
+def new_generation(shift_key):
+    """Staging folder untuk output mode 1/2, di-swap ke outputs/shiftN saat run selesai."""
+    from utils.shift_rotation import ShiftGeneration
+
+    return ShiftGeneration(OUTPUT_DIR, shift_key, SHIFT_RETENTION)
 
+def clean_shift_folder(shift_key):
+    """Ganti folder shift dengan folder kosong (rename atomik); isi lama dihapus di background."""
+    shift_outdir = new_generation(shift_key).open().commit()
+    print(f"{GREEN}[OK]{RESET} Folder {shift_outdir} dikosongkan (isi lama dihapus di background)...")
     return shift_outdir
 
 
 # ==================== WRITE WA ====================
-def write_wa(offenses, logs, shift_key, template_file):
+def write_wa(offenses_count, logs_count, shift_key, template_file, stats=None, out_dir=None):
+    """
+    offenses_count / logs_count: Counter event_name hasil wa_count_stage.
+    stats: ShiftStats opsional untuk placeholder {total_events}, {top_src_ip},
+    {top_src_country}, {top_dst_port}, {severity} dan {hourly}.
+    out_dir: folder tujuan (default outputs/shiftN, atau folder staging).
+    """
     greeting, jam = SHIFTS[shift_key]
     tanggal = datetime.now().strftime("%d/%m/%Y")
 
     with open(template_file, "r", encoding="utf-8") as f:
         template = f.read()
 
-    offenses_count = Counter(e['event_name'] for e in offenses)
-    logs_count = Counter(e['event_name'] for e in logs)
-
     offenses_str = "\n".join(f"{i}. {name} ({count} events)" for i, (name, count) in enumerate(offenses_count.items(), 1)) or "Tidak ada event terdeteksi"
     logs_str = "\n".join(f"{i}. {name} ({count} events)" for i, (name, count) in enumerate(logs_count.items(), 1)) or "Tidak ada event terdeteksi"
 
@@ -214,115 +385,321 @@ def write_wa(offenses, logs, shift_key, template_file):
                       .replace("{jam}", jam)\
                       .replace("{offenses}", offenses_str)\
                       .replace("{log_activity}", logs_str)
+    if stats is not None:
+        for name, value in stats.placeholders().items():
+            wa_text = wa_text.replace("{" + name + "}", value)
 
-    shift_outdir = os.path.join(OUTPUT_DIR, f"shift{shift_key}")
-    out_file = os.path.join(shift_outdir, f"wa_shift{shift_key}.txt")
-    with open(out_file, "w", encoding="utf-8") as f:
-        f.write(wa_text)
+    file_name = f"wa_shift{shift_key}.txt"
+    out_file = os.path.join(out_dir or shift_dir(shift_key), file_name)
+    metrics.current.count("bytes_written", write_text_file(out_file, wa_text))
+    metrics.current.count("files_written")
+
+    print(f"{YELLOW}[INFO]{RESET} WA master tersimpan di {os.path.join(shift_dir(shift_key), file_name)}")
+
+def new_shift_stats(mag_map):
+    return ShiftStats(mag_map, categorize_magnitude, top_n=STATS_TOP_N)
 
-    print(f"{YELLOW}[INFO]{RESET} WA master tersimpan di {out_file}")
+def write_shift_stats(stats, shift_key, out_dir=None):
+    """Ringkasan statistik shift (JSON) di samping WA master."""
+    file_name = f"stats_shift{shift_key}.json"
+    out_file = os.path.join(out_dir or shift_dir(shift_key), file_name)
+    stats.write_summary(out_file, shift=shift_key, generated_at=datetime.now().isoformat(timespec="seconds"))
+    print(f"{YELLOW}[INFO]{RESET} Statistik shift tersimpan di {os.path.join(shift_dir(shift_key), file_name)}")
 
 # ==================== TEMPLATE EVENT ====================
 def check_template(event_name):
-    filename = os.path.join(TEMPLATE_DIR, f"{event_name}.txt")
-    if not os.path.exists(filename):
+    """Kembalikan template ter-compile (dari cache), atau None kalau belum ada."""
+    template = template_cache.get(event_name)
+    if template is None:
         print(f"{RED}[WARNING]{RESET} Template untuk '{event_name}' belum ditemukan, dilewati...")
-        return False
-    return True
-
-def fill_template(template_content, event_data, mag_map=None):
-    filled_content = template_content
-    for key, value in event_data.items():
-        filled_content = filled_content.replace(f"{{{key}}}", str(value))
-
+    return template
+
+def get_ip_table():
+    """Tabel enrichment IP (lewat db_cache), atau None kalau tidak tersedia. Dipanggil sekali per stage."""
+    from utils import ip_enrich
+
+    path = ip_enrich.table_path(IP_TABLE_FILE) if IP_TABLE_FILE else None
+    if path is None:
+        return None
+    # parse TSV hanya kalau tabel berubah; run berikutnya memakai snapshot biner
+    return db_cache.get(path, ip_enrich.IpRangeTable, snapshot=True)
+
+def uses_ip_enrichment(template):
+    from utils import ip_enrich
+
+    return not ip_enrich.PLACEHOLDERS.isdisjoint(template.names)
+
+def enrichment_table(template, ip_table):
+    """
+    Tabel enrichment (ip_table, hasil get_ip_table untuk stage ini) kalau
+    template memakai placeholder country/ASN, selain itu None.
+    """
+    global _ip_table_warned
+    from utils import ip_enrich
+
+    if not uses_ip_enrichment(template):
+        return None
+    # template lama yang hanya memakai {src_country}/{dst_country} tidak perlu peringatan
+    if ip_table is None and not _ip_table_warned and not ip_enrich.GEO_PLACEHOLDERS.isdisjoint(template.names):
+        _ip_table_warned = True
+        print(f"{YELLOW}[INFO]{RESET} Tabel IP enrichment '{IP_TABLE_FILE}' tidak ditemukan, "
+              f"placeholder country/ASN tidak diisi...")
+    return ip_table
+
+def fill_template(template_content, event_data, mag_map=None, ip_table=None):
+    """
+    template_content boleh string mentah atau CompiledTemplate. ip_table →
+    tabel enrichment yang sudah di-resolve pemanggil (lihat enrichment_table),
+    tidak dicari ulang per event.
+    """
+    if isinstance(template_content, str):
+        template_content = compile_template(template_content)
+
+    extra = None
     if mag_map:
         event_name = event_data.get("event_name", "")
         magnitude = mag_map.get(event_name)
         if magnitude:
-            severity = categorize_magnitude(magnitude)
-            filled_content = filled_content.replace("{sev_magnitude}", str(magnitude))
-            filled_content = filled_content.replace("{severity}", severity)
-
-    return filled_content
-
-def write_event_details(events, shift_key, mag_map=None):
-    shift_outdir = os.path.join(OUTPUT_DIR, f"shift{shift_key}")
+            extra = {"sev_magnitude": magnitude, "severity": categorize_magnitude(magnitude)}
+
+    if ip_table is not None:
+        geo = ip_table.placeholders(event_data.get("src_ip", ""), event_data.get("dst_ip", ""),
+                                    event_data.get("src_country", ""), event_data.get("dst_country", ""))
+        extra = {**geo, **extra} if extra else geo
+
+    return template_content.render(event_data, extra)
+
+def write_text_file(path, content):
+    """Tulis file teks, return jumlah byte (UTF-8) yang ditulis."""
+    data = content.encode("utf-8")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    return len(data)
+
+def event_details_stage(events, shift_key, mag_map=None, workers=1, skip_existing=False, manifest=None,
+                        bundle=None, out_dir=None, previous_dir=None):
+    """
+    Stage streaming: tulis file detail per event lalu teruskan event-nya.
+    workers > 1 → render tetap di thread utama, penulisan file dikerjakan
+    thread pool dan console hanya menampilkan satu ringkasan di akhir.
+    skip_existing → file detail yang sudah ada tidak ditulis ulang (mode watch).
+    manifest → RenderManifest; file yang input, template dan magnitude-nya
+    tidak berubah sejak run sebelumnya tidak di-render ulang.
+    bundle → ReportBundle; semua report ditulis berurutan ke satu arsip zip
+    (tanpa thread pool dan tanpa file per event).
+    out_dir → folder tujuan (default outputs/shiftN). previous_dir → folder
+    generasi sebelumnya; file yang tidak berubah menurut manifest di-hardlink
+    dari sana alih-alih di-render ulang.
+    """
+    shift_outdir = out_dir or shift_dir(shift_key)
     os.makedirs(shift_outdir, exist_ok=True)
 
     processed_event_names = set()
     valid_types = ["Log Activity", "Offensess"]
 
     line_counter = 0  # penghitung baris untuk selang-seling
+    unchanged = 0     # file yang dilewati karena manifest sama
+    templates = {}    # event_name -> (template, tabel enrichment), dicek sekali per run
+    ip_table = None   # tabel IP di-resolve sekali per stage, saat template pertama membutuhkannya
+    ip_resolved = False
+
+    pool = None
+    if workers > 1 and bundle is None:
+        from concurrent.futures import ThreadPoolExecutor
+        pool = ThreadPoolExecutor(max_workers=workers)
+    pending = deque()
+    max_pending = workers * 4  # batasi antrean supaya memori tetap datar
+    failed = []
+    bytes_written = 0
+    elapsed = 0.0
+    cache_hits, cache_misses = template_cache.hits, template_cache.misses
+
+    def collect(job):
+        nonlocal bytes_written
+        file_name, future = job
+        try:
+            bytes_written += future.result()
+        except OSError as e:
+            failed.append(e)
+            if manifest is not None:
+                manifest.forget(file_name)
 
-    for event_data in events:
-        event_name = event_data.get("event_name", "").strip().strip('"')
-        ticket_id = event_data.get("ticket_id", "").strip()
-        event_type = event_data.get("event_type", "").strip()
+    def reuse_previous(file_name, out_file):
+        if previous_dir is None:
+            return os.path.exists(out_file)
+        from utils.shift_rotation import link_or_copy
 
-        if not ticket_id or event_type not in valid_types:
-            continue
+        return link_or_copy(os.path.join(previous_dir, file_name), out_file)
 
-        unique_key = f"{event_name}_{ticket_id}_{event_type}"
-        if unique_key in processed_event_names:
-            continue
+    completed = False
+    try:
+        for event_data in events:
+            start = time.perf_counter()
+            event_name = event_data.get("event_name", "").strip().strip('"')
+            ticket_id = event_data.get("ticket_id", "").strip()
+            event_type = event_data.get("event_type", "").strip()
+            unique_key = f"{event_name}_{ticket_id}_{event_type}"
+
+            file_name = f"{event_name}_{ticket_id}_{event_type}.txt"
+            out_file_unique = os.path.join(shift_outdir, file_name)
+
+            if (ticket_id and event_type in valid_types and unique_key not in processed_event_names
+                    and not (skip_existing and os.path.exists(out_file_unique))):
+                if event_name not in templates:
+                    template = check_template(event_name)
+                    table = None
+                    if template is not None:
+                        if not ip_resolved and uses_ip_enrichment(template):
+                            ip_table, ip_resolved = get_ip_table(), True
+                        table = enrichment_table(template, ip_table)
+                    templates[event_name] = (template, table)
+                template, table = templates[event_name]
+            else:
+                template = None
 
-        if check_template(event_name):
-            template_file = os.path.join(TEMPLATE_DIR, f"{event_name}.txt")
-            with open(template_file, "r", encoding="utf-8") as f:
-                template = f.read()
+            if template is not None:
+                processed_event_names.add(unique_key)
 
-            filled_template = fill_template(template, event_data, mag_map)
-            out_file_unique = os.path.join(
-                shift_outdir, f"{event_name}_{ticket_id}_{event_type}.txt"
-            )
+                entry = None
+                if manifest is not None:
+                    entry = manifest.entry(event_data, template, mag_map.get(event_name) if mag_map else None,
+                                           table.version if table is not None else None)
+                    manifest.record(file_name, entry)
 
-            with open(out_file_unique, "w", encoding="utf-8") as f:
-                f.write(filled_template)
+                if entry and manifest.is_current(file_name, entry) and reuse_previous(file_name, out_file_unique):
+                    unchanged += 1
+                else:
+                    filled_template = fill_template(template, event_data, mag_map, table)
+
+                    if bundle is not None:
+                        bytes_written += bundle.add(file_name, filled_template, event_name, ticket_id, event_type)
+                    elif pool:
+                        pending.append((file_name, pool.submit(write_text_file, out_file_unique, filled_template)))
+                        if len(pending) >= max_pending:
+                            collect(pending.popleft())
+                    else:
+                        bytes_written += write_text_file(out_file_unique, filled_template)
+
+                        # pilih warna selang-seling (cyan ↔ magenta)
+                        color = CYAN if line_counter % 2 == 0 else MAGENTA
+                        print(f"{GREEN}[OK]{RESET} {color}{event_name} | {ticket_id} | {event_type}{RESET}")
+
+                    line_counter += 1
+
+            elapsed += time.perf_counter() - start
+            yield event_data
+        completed = True
+    finally:
+        if pool:
+            start = time.perf_counter()
+            while pending:
+                collect(pending.popleft())
+            pool.shutdown()
+            elapsed += time.perf_counter() - start
+
+            written = line_counter - len(failed)
+            print(f"{GREEN}[OK]{RESET} {written} file event tersimpan di {shift_dir(shift_key)} ({workers} worker)")
+            if failed:
+                print(f"{RED}[WARNING]{RESET} {len(failed)} file gagal ditulis, contoh: {failed[0]}")
+
+        if bundle is not None:
+            print(f"{GREEN}[OK]{RESET} {line_counter} report event masuk bundle "
+                  f"{os.path.join(shift_dir(shift_key), os.path.basename(bundle.path))}")
+
+        # manifest hanya diperbarui kalau seluruh input selesai diproses
+        if manifest is not None and completed:
+            # di staging file lama cukup tidak di-link; di folder aktif dihapus
+            removed = len(manifest.stale()) if previous_dir else manifest.remove_stale(shift_outdir)
+            manifest.save()
+            metrics.current.count("files_removed", removed)
+            print(f"{YELLOW}[INFO]{RESET} Incremental: {line_counter} ditulis, "
+                  f"{unchanged} tidak berubah, {removed} file lama dihapus.")
+
+        run = metrics.current
+        run.add_time("render_write", elapsed)
+        run.count("files_written", line_counter - len(failed))
+        run.count("files_failed", len(failed))
+        run.count("files_unchanged", unchanged)
+        run.count("bytes_written", bytes_written)
+        run.count("template_cache_hits", template_cache.hits - cache_hits)
+        run.count("template_cache_misses", template_cache.misses - cache_misses)
+        run.count("templates_missing", sum(1 for t in templates.values() if t is None))
+
+def write_event_details(events, shift_key, mag_map=None, workers=1):
+    drain(event_details_stage(events, shift_key, mag_map, workers))
 
-            # pilih warna selang-seling (cyan ↔ magenta)
-            color = CYAN if line_counter % 2 == 0 else MAGENTA
-            print(f"{GREEN}[OK]{RESET} {color}{event_name} | {ticket_id} | {event_type}{RESET}")
+# ==================== FILE XML ====================
+OFFENSE_COLUMNS = [
+    "id", "magnitude", "closeUser", "formattedClosedDate", "localizedCloseReason",
+    "deviceOrderBy", "escapedFormattedOffenseSource", "formattedOffenseType",
+    "description", "severity", "eventCount", "eventDescription", "startTime",
+    "endTime", "attacker", "target", "deviceCount", "targetNetwork",
+    "attackerNetwork", "usernameOrderBy",
+]
+
+def read_offense_columns(xml_file):
+    """
+    Baca export offense QRadar secara incremental (iterparse).
+    Setiap <OffenseForm> langsung dimasukkan ke buffer per kolom lalu
+    dibebaskan, jadi file ratusan MB tidak perlu dimuat utuh sebagai tree.
+    Return: (columns {kolom: [nilai]}, contoh formattedClosedDate pertama)
+    """
+    import xml.etree.ElementTree as ET
+
+    columns = {name: [] for name in OFFENSE_COLUMNS}
+    wanted = set(OFFENSE_COLUMNS)
+    closed_date_sample = None
 
-            processed_event_names.add(unique_key)
-            line_counter += 1
+    root = None
+    depth = 0
+    for event, elem in ET.iterparse(xml_file, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+            depth += 1
+            continue
 
-# ==================== FILE XML ====================
-def xml_to_excel(xml_file, shift_key):
-    tree = ET.parse(xml_file)
-    root = tree.getroot()
+        depth -= 1
+        if depth != 1 or elem.tag != "OffenseForm":
+            continue
 
-    rows = []
-    closed_date_sample = None
+        # sama seperti findtext(tag, ""): ambil child pertama dengan tag tsb
+        values = {}
+        for child in elem:
+            if child.tag in wanted and child.tag not in values:
+                values[child.tag] = child.text or ""
+        for name, buffer in columns.items():
+            buffer.append(values.get(name, ""))
 
-    for offense in root.findall("OffenseForm"):
-        closed_date = offense.findtext("formattedClosedDate", "")
+        closed_date = values.get("formattedClosedDate", "")
         if closed_date and not closed_date_sample:
             closed_date_sample = closed_date
 
-        rows.append({
-            "id": offense.findtext("id", ""),
-            "magnitude": offense.findtext("magnitude", ""),
-            "closeUser": offense.findtext("closeUser", ""),
-            "formattedClosedDate": closed_date,
-            "localizedCloseReason": offense.findtext("localizedCloseReason", ""),
-            "deviceOrderBy": offense.findtext("deviceOrderBy", ""),
-            "escapedFormattedOffenseSource": offense.findtext("escapedFormattedOffenseSource", ""),
-            "formattedOffenseType": offense.findtext("formattedOffenseType", ""),
-            "description": offense.findtext("description", ""),
-            "severity": offense.findtext("severity", ""),
-            "eventCount": offense.findtext("eventCount", ""),
-            "eventDescription": offense.findtext("eventDescription", ""),
-            "startTime": offense.findtext("startTime", ""),
-            "endTime": offense.findtext("endTime", ""),
-            "attacker": offense.findtext("attacker", ""),
-            "target": offense.findtext("target", ""),
-            "deviceCount": offense.findtext("deviceCount", ""),
-            "targetNetwork": offense.findtext("targetNetwork", ""),
-            "attackerNetwork": offense.findtext("attackerNetwork", ""),
-            "usernameOrderBy": offense.findtext("usernameOrderBy", ""),
-        })
-
-    df = pd.DataFrame(rows)
+        root.clear()  # buang OffenseForm yang sudah diproses
+
+    return columns, closed_date_sample
+
+def xml_to_excel(xml_file, shift_key, fmt="xlsx", store=None, dedup=None):
+    """
+    fmt: xlsx (streaming write-only), csv, parquet atau feather.
+    store → offense juga disimpan ke event store.
+    dedup → offense yang sudah diexport shift lain tidak diexport ulang.
+    """
+    with metrics.current.stage("xml_parse"):
+        columns, closed_date_sample = read_offense_columns(xml_file)
+    metrics.current.count("offenses_parsed", len(columns["id"]))
+    if store is not None:
+        with metrics.current.stage("store"):
+            store.insert_offenses(columns, OFFENSE_COLUMNS, shift_key, os.path.basename(xml_file))
+    if dedup is not None:
+        with metrics.current.stage("dedup"):
+            duplicate = dedup.check_many([f"offense:{oid}" if oid else None for oid in columns["id"]])
+        keep = [not flag for flag in duplicate]
+        skipped = keep.count(False)
+        if skipped:
+            columns = {name: [value for value, kept in zip(values, keep) if kept] for name, values in columns.items()}
+            metrics.current.count("duplicates_skipped", skipped)
+            print(f"{YELLOW}[INFO]{RESET} {skipped} offense sudah diexport di shift sebelumnya, dilewati.")
 
     tanggal_file = "UnknownDate"
     if closed_date_sample:
@@ -335,41 +712,23 @@ def xml_to_excel(xml_file, shift_key):
 
     salam, jam = SHIFTS.get(shift_key, ("Shift Tidak Dikenal", ""))
 
-    base_name = f"FollowUp & Closed Offenses List - {tanggal_file} ( Shift {shift_key} ).xlsx"
-    output_dir = Path("./outputs/")
+    base_name = f"FollowUp & Closed Offenses List - {tanggal_file} ( Shift {shift_key} )"
+    output_dir = Path(OUTPUT_DIR)
     output_dir.mkdir(parents=True, exist_ok=True)
-    output_excel = output_dir / base_name 
-    df.to_excel(output_excel, index=False)
-    print(f"{GREEN}[OK]{RESET} Excel berhasil dibuat: {output_excel}")
+    with metrics.current.stage("export"):
+        output_file = export_offenses(columns, OFFENSE_COLUMNS, output_dir / base_name, fmt)
+    metrics.current.count("files_written")
+    metrics.current.count("bytes_written", os.path.getsize(output_file))
+    print(f"{GREEN}[OK]{RESET} File {fmt} berhasil dibuat: {output_file}")
 
 # ==================== LOAD DATABASE EVENT ====================
-def load_event_names(csv_file="./database/events_magnitude_list.csv"):
-    events = []
-    try:
-        with open(csv_file, newline='', encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                if "Event Name" in row and row["Event Name"].strip():
-                    events.append(row["Event Name"].strip())
-    except FileNotFoundError:
-        print(f"{RED}[WARNING]{RESET} File '{csv_file}' tidak ditemukan. Validasi event dilewati.")
-    return events
+def load_event_names(csv_file=EVENT_DB_FILE):
+    return list(db_cache.get(csv_file, read_event_database)[0])
 
 # ==================== SUGGERTON EVENT ====================
-def suggest_event(event_name, valid_events):
-    event_name_lower = event_name.lower()
-
-    substring_matches = [e for e in valid_events if event_name_lower in e.lower()]
-    if substring_matches:
-        return substring_matches[:5]
-
-    suggestions_lower = difflib.get_close_matches(event_name_lower, [e.lower() for e in valid_events], n=3, cutoff=0.5)
-    suggestions = []
-    for s in suggestions_lower:
-        original = next(e for e in valid_events if e.lower() == s)
-        suggestions.append(original)
-
-    return suggestions
+def suggest_event(event_name, index):
+    """Saran nama event dari index trigram EventIndex (substring dulu, lalu fuzzy)."""
+    return index.suggest(event_name)
 
 def list_events(valid_events):
     print(f"\n{YELLOW}[INFO]{RESET} Daftar Event yang tersedia di database:")
@@ -389,44 +748,102 @@ def get_multiline_input(prompt):
         lines.append(line)
     return "\n".join(lines)
 
-def generate_template(event_name, deskripsi, mitigasi):
-    TEMPLATE_FILE = "./templates/Tamplate.txt"
-    OUTPUT_DIR = "templates"
+def read_base_template(file_path):
+    with open(file_path, "r", encoding="utf-8") as f:
+        return f.read()
 
-    with open(TEMPLATE_FILE, "r", encoding="utf-8") as f:
-        base_template = f.read()
+def fill_base_template(base_template, deskripsi, mitigasi):
+    return base_template.replace("{deskripsi}", deskripsi).replace("{mitigasi}", mitigasi)
 
-    filled_template = base_template.replace("{deskripsi}", deskripsi).replace("{mitigasi}", mitigasi)
+def generate_template(event_name, deskripsi, mitigasi, overwrite=None):
+    """overwrite: None → tanya user kalau file sudah ada, True/False → tanpa prompt."""
+    base_template = db_cache.get(BASE_TEMPLATE_FILE, read_base_template)
+    filled_template = fill_base_template(base_template, deskripsi, mitigasi)
 
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    os.makedirs(TEMPLATE_DIR, exist_ok=True)
     safe_name = event_name
-    out_file = os.path.join(OUTPUT_DIR, f"{safe_name}.txt")
+    out_file = os.path.join(TEMPLATE_DIR, f"{safe_name}.txt")
 
     # kalau file sudah ada → tanya overwrite
     if os.path.exists(out_file):
-        choice = Prompt.ask(
-            f"{YELLOW}[INFO]{RESET} File '{out_file}' sudah ada. Timpa?",
-            choices=["y", "n"], default="n"
-        )
-        if choice.lower() != "y":
+        if overwrite is None:
+            from rich.prompt import Prompt
+            overwrite = Prompt.ask(
+                f"{YELLOW}[INFO]{RESET} File '{out_file}' sudah ada. Timpa?",
+                choices=["y", "n"], default="n"
+            ).lower() == "y"
+        if not overwrite:
             print(f"{RED}[CANCEL]{RESET} Template '{event_name}' tidak dibuat.")
-            return
+            return False
 
     with open(out_file, "w", encoding="utf-8") as f:
         f.write(filled_template)
 
     print(f"{GREEN}[OK]{RESET} Template event '{event_name}' berhasil dibuat di {out_file}")
+    return True
+
+def generate_templates_batch(feed_file, index, overwrite=False, workers=WRITE_WORKERS):
+    """
+    Buat banyak template sekaligus dari feed signature vendor (lihat
+    utils.template_feed). Nama event divalidasi ke EventIndex (ditulis dengan
+    nama kanonik database), kerangka template dibaca sekali, semua template
+    di-render dalam satu pass lalu ditulis paralel di thread pool.
+    overwrite=False → template yang sudah ada dilewati, True → ditimpa.
+    Return jumlah template yang ditulis.
+    """
+    try:
+        records, errors = read_template_feed(feed_file)
+        base_template = db_cache.get(BASE_TEMPLATE_FILE, read_base_template)
+    except (OSError, ValueError) as e:
+        print(f"{RED}[ERROR]{RESET} Gagal membaca feed '{feed_file}': {e}")
+        return 0
+
+    jobs = {}  # nama kanonik → (out_file, isi); record terakhir untuk nama yang sama dipakai
+    unknown, existing = [], []
+    for record in records:
+        event_name = index.canonical(record["event_name"])
+        if not event_name:
+            unknown.append(record["event_name"])
+            continue
+        out_file = os.path.join(TEMPLATE_DIR, f"{event_name}.txt")
+        if not overwrite and os.path.exists(out_file):
+            existing.append(event_name)
+            continue
+        jobs[event_name] = (out_file, fill_base_template(base_template, record["deskripsi"], record["mitigasi"]))
+
+    for message in errors[:10]:
+        print(f"{YELLOW}[WARNING]{RESET} {message}")
+    for event_name in unknown[:10]:
+        suggestions = suggest_event(event_name, index)
+        hint = f" (mungkin: {', '.join(suggestions[:3])})" if suggestions else ""
+        print(f"{RED}[WARNING]{RESET} Event '{event_name}' tidak ada di database, dilewati{hint}")
+    if len(unknown) > 10:
+        print(f"{RED}[WARNING]{RESET} ... dan {len(unknown) - 10} event lain tidak ada di database")
+
+    os.makedirs(TEMPLATE_DIR, exist_ok=True)
+    failed = []
+    written = 0
+    if jobs:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(jobs)))) as pool:
+            futures = {pool.submit(write_text_file, out_file, content): event_name
+                       for event_name, (out_file, content) in jobs.items()}
+            for future, event_name in futures.items():
+                try:
+                    future.result()
+                    written += 1
+                except OSError as e:
+                    failed.append(f"{event_name}: {e}")
+    for message in failed[:10]:
+        print(f"{RED}[ERROR]{RESET} Gagal menulis template {message}")
+
+    print(f"{GREEN}[OK]{RESET} {written} template {'ditulis/ditimpa' if overwrite else 'dibuat'}, "
+          f"{len(existing)} sudah ada (dilewati), {len(unknown)} event tidak dikenal, "
+          f"{len(errors)} record tidak valid, {len(failed)} gagal ditulis.")
+    return written
 
 # ==================== LOAD FALSE POSITIVE ====================
-def normalize(text):
-    if not text:
-        return ""
-    text = text.replace("\xa0", " ")
-    text = text.strip().lower()
-    text = re.sub(r"\s+", " ", text)
-    return text
-
-def load_false_positive(file_path="./database/False_Positive.txt"):
+def read_false_positive(file_path):
     fp_events = set()
     try:
         with open(file_path, "r", encoding="utf-8-sig") as f:
@@ -436,38 +853,99 @@ def load_false_positive(file_path="./database/False_Positive.txt"):
                     fp_events.add(normalize(event_name))
     except FileNotFoundError:
         print(f"{YELLOW}[WARNING]{RESET} File {file_path} tidak ditemukan.")
-    return fp_events
+    return frozenset(fp_events)
+
+def load_false_positive(file_path=FP_FILE):
+    """Daftar nama FP (ter-normalisasi); dibaca ulang otomatis kalau file diubah selama sesi."""
+    return set(db_cache.get(file_path, read_false_positive))
+
+def read_fp_rule_set(file_path):
+    from utils.fp_rules import load_fp_rules
+
+    rules, errors = load_fp_rules(file_path)
+    for line_no, message in errors:
+        print(f"{RED}[WARNING]{RESET} Rule FP baris {line_no} dilewati: {message}")
+    return rules
+
+def load_fp_rule_set(file_path=None):
+    return db_cache.get(file_path or FP_RULES_FILE, read_fp_rule_set)
+
+def event_db_stamp():
+    """Versi file database event + FP + rule FP, untuk tahu kapan index perlu dibangun ulang."""
+    return tuple(file_stamp(path) for path in (EVENT_DB_FILE, FP_FILE, FP_RULES_FILE))
 
-def check_event_status(event_name, fp_events, valid_events):
-    norm_name = normalize(event_name)
+def build_event_index(fp_events, csv_file=EVENT_DB_FILE):
+    """Index database event (nama, magnitude, FP, rule FP) — dibangun sekali per run."""
+    return EventIndex(load_event_names(csv_file), load_event_magnitudes(csv_file), fp_events, load_fp_rule_set())
+
+def check_event_status(event_name, index):
+    entry = index.lookup(event_name)
 
     # Kalau event ada di database
-    if any(norm_name == normalize(e) for e in valid_events):
+    if entry:
+        _, _, is_fp = entry
         # Kalau event termasuk FP
-        if norm_name in [normalize(e) for e in fp_events]:
+        if is_fp:
             return "FP", None
         else:
             return "VALID", None
 
     # Kalau tidak ada di database → Unknown + Suggestion
-    suggestions = suggest_event(event_name, valid_events)
+    suggestions = suggest_event(event_name, index)
     return "UNKNOWN", suggestions
-def print_false_positive_summary(events, fp_events, valid_events):
-    detected_fp = []
+
+def collect_false_positive(events, index):
+    """
+    Kumpulkan event FP / unknown dari aliran event (bisa generator).
+    detected_fp: nama event → None (daftar nama FP) atau deskripsi rule FP yang cocok.
+    """
+    detected_fp = {}
     detected_unknown = []
+    status_cache = {}  # event_name mentah -> (status, suggestions, kandidat rule FP)
+    rules = index.fp_rules
+    elapsed = 0.0
+    fp_count = rule_count = 0
 
     for e in events:
-        status, suggestions = check_event_status(e["event_name"], fp_events, valid_events)
+        start = time.perf_counter()
+        event_name = e["event_name"]
+        result = status_cache.get(event_name)
+        if result is None:
+            status, suggestions = check_event_status(event_name, index)
+            candidates = rules.candidates(event_name) if rules and status != "FP" else ()
+            result = status_cache[event_name] = (status, suggestions, candidates)
+        status, suggestions, candidates = result
+        rule = None
+        if candidates:
+            rule = next((r for r in candidates if r.matches(e)), None)
         if status == "FP":
-            detected_fp.append(e["event_name"])
+            detected_fp[event_name] = None
+            fp_count += 1
+        elif rule is not None:
+            detected_fp.setdefault(event_name, rule.describe())
+            fp_count += 1
+            rule_count += 1
         elif status == "UNKNOWN":
-            detected_unknown.append((e["event_name"], suggestions))
+            detected_unknown.append((event_name, suggestions))
+        elapsed += time.perf_counter() - start
+
+    metrics.current.add_time("fp_check", elapsed)
+    metrics.current.count("fp_events", fp_count)
+    metrics.current.count("fp_rule_events", rule_count)
+    metrics.current.count("fp_event_names", len(detected_fp))
+    metrics.current.count("unknown_events", len(detected_unknown))
+    metrics.current.count("unknown_event_names", len({name for name, _ in detected_unknown}))
+    return detected_fp, detected_unknown
 
+def print_false_positive_summary(events, index):
+    show_false_positive_summary(*collect_false_positive(events, index))
+
+def show_false_positive_summary(detected_fp, detected_unknown):
     # Tampilkan False Positive
     if detected_fp:
         console.print("\n[bold red]============== FALSE POSITIVE DETECTION ==============[/bold red]")
-        for i, name in enumerate(set(detected_fp), 1):
-            console.print(f"[red]{i}.[/red] {name}")
+        for i, (name, rule) in enumerate(detected_fp.items(), 1):
+            console.print(f"[red]{i}.[/red] {name}" + (f" [dim](rule: {rule})[/dim]" if rule else ""))
         console.print("[bold red]======================================================[/bold red]\n")
     else:
         console.print("\n[bold red]===== FALSE POSITIVE DETECTION =====[/bold red]")
@@ -485,100 +963,187 @@ def print_false_positive_summary(events, fp_events, valid_events):
         console.print("[bold yellow]======================================================[/bold yellow]\n")
 
 # ==================== MANU ====================
-def run_mode_1(shift, fp_events):
-    txt_files = glob.glob("./input/*.txt")
+def run_mode_1(shift, fp_events, from_date=None):
+    """
+    from_date (YYYY-MM-DD) → WA report dari event store, bukan dari input/*.txt.
+    Return False kalau store / event tanggal itu tidak ada (output lama tidak disentuh).
+    """
+    txt_files = [] if from_date else glob.glob(os.path.join(INPUT_DIR, "*.txt"))
     wa_template_file = os.path.join(TEMPLATE_DIR, "wa.txt")
 
-    if not txt_files:
+    if not txt_files and not from_date:
         print(f"{RED}[ERROR]{RESET} file .txt tidak ditemukan!")
         return
 
     if not os.path.exists(wa_template_file):
         print(f"{RED}[ERROR]{RESET} Template WA '{wa_template_file}' tidak ditemukan!")
         return
+    if from_date and not store_has_events(shift, from_date):
+        return False
 
-    clean_shift_folder(shift)
-
-    all_events = []
-    for txt_file in txt_files:
-        all_events.extend(parse_txt_file(txt_file))
-
-    mag_map = load_event_magnitudes(os.path.join("database", "events_magnitude_list.csv"))
-
-    offenses = [e for e in all_events if e["event_type"].strip() == "Offensess"]
-    log_activities = [e for e in all_events if e["event_type"].strip() == "Log Activity"]
-
-    valid_events = load_event_names()
-    write_wa(offenses, log_activities, shift, wa_template_file)
-    print_false_positive_summary(all_events, fp_events, valid_events)
-
-    
-
-
-
-def run_mode_2(shift, fp_events):
-    """Event Report (dari TXT) — buat file detail per event berdasarkan template."""
-    txt_files = glob.glob("./input/*.txt")
-    if not txt_files:
+    run = metrics.start_run("1", shift)
+    with run.stage("load_database"):
+        index = build_event_index(fp_events)
+
+    # Output dibangun di staging; folder shift lama baru diganti kalau run selesai
+    with open_dedup(shift, from_date) as dedup, new_generation(shift) as generation, \
+            open_event_store(USE_EVENT_STORE or from_date) as store:
+        offenses_count = Counter()
+        logs_count = Counter()
+        stats = new_shift_stats(index.mag_map)
+        events = iter_report_events(txt_files, shift, store, from_date)
+        if dedup is not None:
+            events = dedup.stage(events, ticket_key)
+        events = wa_count_stage(events, offenses_count, logs_count)
+        events = stats.stage(events)
+        fp_result = collect_false_positive(events, index)
+
+        with run.stage("write_wa"):
+            write_wa(offenses_count, logs_count, shift, wa_template_file, stats, generation.staging_dir)
+            write_shift_stats(stats, shift, generation.staging_dir)
+    show_false_positive_summary(*fp_result)
+    finish_run_report(run)
+
+
+def bundle_path(shift, out_dir=None):
+    return os.path.join(out_dir or shift_dir(shift), f"event_reports_shift{shift}.zip")
+
+def run_mode_2(shift, fp_events, bundle=False, from_date=None):
+    """
+    Event Report (dari TXT) — buat file detail per event berdasarkan template.
+    bundle=True → semua report masuk satu zip (+ index.json) alih-alih satu file per event.
+    from_date (YYYY-MM-DD) → event diambil dari event store, bukan dari input/*.txt;
+    return False kalau store / event tanggal itu tidak ada.
+    Output dibangun di folder staging lalu di-swap ke outputs/shiftN saat selesai.
+    """
+    txt_files = [] if from_date else glob.glob(os.path.join(INPUT_DIR, "*.txt"))
+    if not txt_files and not from_date:
         print(f"{RED}[ERROR]{RESET} file .txt tidak ditemukan!")
         return
+    if from_date and not store_has_events(shift, from_date):
+        return False
 
-    shift_outdir = clean_shift_folder(shift)
-
-    all_events = []
-    for txt_file in txt_files:
-        all_events.extend(parse_txt_file(txt_file))
-
-    # Load magnitude mapping
-    mag_map = load_event_magnitudes(os.path.join("database", "events_magnitude_list.csv"))
-
-    valid_events = load_event_names()
-
-    write_event_details(all_events, shift, mag_map)
-
-    print_false_positive_summary(all_events, fp_events, valid_events)
+    run = metrics.start_run("2", shift)
 
+    # Index database event (sekaligus magnitude mapping)
+    with run.stage("load_database"):
+        index = build_event_index(fp_events)
 
+    with open_dedup(shift, from_date) as dedup, new_generation(shift) as generation, \
+            open_event_store(USE_EVENT_STORE or from_date) as store:
+        events = iter_report_events(txt_files, shift, store, from_date)
+        if dedup is not None:
+            events = dedup.stage(events, ticket_key)
 
+        if bundle:
+            from utils.report_bundle import ReportBundle
 
-def run_mode_3(shift):
-    """XML → Excel"""
-    xml_files = glob.glob("./input/*.xml")
+            with ReportBundle(bundle_path(shift, generation.staging_dir)) as report_bundle:
+                events = event_details_stage(events, shift, index.mag_map, bundle=report_bundle,
+                                             out_dir=generation.staging_dir)
+                print_false_positive_summary(events, index)
+            metrics.current.count("bytes_bundle", os.path.getsize(report_bundle.path))
+        else:
+            manifest = RenderManifest(os.path.join(generation.staging_dir, MANIFEST_FILE),
+                                      previous=generation.previous(MANIFEST_FILE))
+            previous_dir = None
+            if manifest.old:
+                # Ada manifest dari run sebelumnya → rebuild incremental: file yang tidak
+                # berubah di-hardlink, file lain (WA, statistik, state watch) ikut dibawa
+                previous_dir = generation.live_dir
+                tracked = manifest.old.keys() | {MANIFEST_FILE}
+                generation.carry_over(name for name in os.listdir(previous_dir)
+                                      if name not in tracked and os.path.isfile(os.path.join(previous_dir, name)))
+
+            # Satu kali baca: parse → tulis detail event → kumpulkan FP/unknown
+            events = event_details_stage(events, shift, index.mag_map, WRITE_WORKERS, manifest=manifest,
+                                         out_dir=generation.staging_dir, previous_dir=previous_dir)
+            print_false_positive_summary(events, index)
+    finish_run_report(run)
+
+
+def export_format_ready(fmt):
+    """Cek modul opsional format export sebelum ada XML yang diproses / dihapus."""
+    module = missing_dependency(fmt)
+    if module is None:
+        return True
+    print(f"{RED}[ERROR]{RESET} {dependency_message(fmt, module)}. Pilih format lain atau install dulu.")
+    return False
+
+
+def run_mode_3(shift, fmt="xlsx"):
+    """XML → Excel (atau CSV / Parquet / Feather)"""
+    xml_files = glob.glob(os.path.join(INPUT_DIR, "*.xml"))
     if not xml_files:
         print(f"{RED}[ERROR]{RESET} file .xml tidak ditemukan!")
         return
+    if not export_format_ready(fmt):
+        return
 
-    for xml_file in xml_files:
-        xml_to_excel(xml_file, shift)
-        try:
-            os.remove(xml_file)
-            print(f"{YELLOW}[INFO]{RESET} File {xml_file} berhasil dihapus.")
-        except Exception as e:
-            print(f"{RED}[ERROR]{RESET} Gagal menghapus {xml_file}: {e}")
+    run = metrics.start_run("3", shift)
+    try:
+        with open_dedup(shift) as dedup, open_event_store(USE_EVENT_STORE) as store:
+            for xml_file in xml_files:
+                xml_to_excel(xml_file, shift, fmt, store, dedup)
+                try:
+                    os.remove(xml_file)
+                    print(f"{YELLOW}[INFO]{RESET} File {xml_file} berhasil dihapus.")
+                except Exception as e:
+                    print(f"{RED}[ERROR]{RESET} Gagal menghapus {xml_file}: {e}")
+    except ExportDependencyError as e:
+        # XML yang gagal diexport tidak dihapus, key dedup run ini di-rollback
+        print(f"{RED}[ERROR]{RESET} Export dihentikan: {e}")
+        return
+    finish_run_report(run)
+
+
+def finish_run_report(run):
+    """Tulis run report JSON (dan Prometheus textfile kalau METRICS_PROM_FILE diisi)."""
+    run.finish()
+    report_file = os.path.join(OUTPUT_DIR, METRICS_DIR, f"run_mode{run.mode}_shift{run.shift}.json")
+    try:
+        run.write_json(report_file)
+        if METRICS_PROM_FILE:
+            run.write_prometheus(METRICS_PROM_FILE)
+    except OSError as e:
+        print(f"{RED}[WARNING]{RESET} Gagal menulis run report: {e}")
+        return
+    print(f"{YELLOW}[INFO]{RESET} Run report tersimpan di {report_file} ({run.wall_seconds:.2f} detik)")
 
 
 def run_mode_4():
-    valid_events = load_event_names()  # list event dari CSV
+    from rich.prompt import Prompt
+
+    index = build_event_index(None)  # index event dari CSV
 
     while True:
-        console.print("Masukkan Nama Event ([red]Exit[/red], [yellow]List[/yellow])")
+        console.print("Masukkan Nama Event ([red]Exit[/red], [yellow]List[/yellow], [green]Batch <file>[/green])")
         event_name = Prompt.ask(">> ").strip()
 
         if event_name.lower() == "exit":
             print(f"{YELLOW}[INFO]{RESET} Kembali ke menu utama.\n")
             return  # <-- balik ke main_menu
         if event_name.lower() == "list":
-            list_events(valid_events)
+            list_events(index.names)
+            continue
+        command, _, argument = event_name.partition(" ")
+        if command.lower() == "batch" and argument.strip():
+            # satu keputusan untuk semua template yang sudah ada, bukan prompt per file
+            overwrite = Prompt.ask(
+                f"{YELLOW}[INFO]{RESET} Template yang sudah ada: skip atau timpa?",
+                choices=["skip", "timpa"], default="skip"
+            ) == "timpa"
+            generate_templates_batch(argument.strip().strip('"'), index, overwrite=overwrite)
             continue
         if not event_name:
             print(f"{RED}[ERROR]{RESET} Nama event tidak boleh kosong!\n")
             continue
 
         # cek exact match
-        matches = [e for e in valid_events if e.lower() == event_name.lower()]
-        if not matches:
+        match = index.canonical(event_name)
+        if not match:
             # tampilkan suggestion
-            suggestions = suggest_event(event_name, valid_events)
+            suggestions = suggest_event(event_name, index)
             if suggestions:
                 print(f"{RED}[ERROR]{RESET} Event '{event_name}' tidak ada di database.")
                 print(f"{YELLOW}[INFO]{RESET} Mungkin maksud Anda:")
@@ -594,14 +1159,15 @@ def run_mode_4():
                     continue
                 else:
                     event_name = choice.strip()
-                    if not any(e.lower() == event_name.lower() for e in valid_events):
+                    if event_name not in index:
                         print(f"{RED}[ERROR]{RESET} Event '{event_name}' tetap tidak valid.\n")
                         continue
+                    event_name = index.canonical(event_name)
             else:
                 print(f"{RED}[ERROR]{RESET} Event '{event_name}' tidak ada di database.\n")
                 continue
         else:
-            event_name = matches[0]
+            event_name = match
 
         # cek apakah file template sudah ada
         out_file = os.path.join("templates", f"{event_name}.txt")
@@ -619,7 +1185,9 @@ def run_mode_4():
         generate_template(event_name, deskripsi, mitigasi)
 
 def run_mode_5(fp_events):
-    valid_events = load_event_names()
+    from rich.prompt import Prompt
+
+    index = build_event_index(fp_events)
     while True:
         console.print("Masukkan Nama Event ([red]Exit[/red], [yellow]ListFP[/yellow], [yellow]ListDB[/yellow])")
         event = Prompt.ask(">> ").strip()
@@ -630,31 +1198,82 @@ def run_mode_5(fp_events):
             print(f"\n{RED}===== DAFTAR FALSE POSITIVE ====={RESET}")
             for i, ev in enumerate(fp_events, 1):
                 print(f"{RED}{i}. {ev}{RESET}")
+            if index.fp_rules:
+                print(f"{YELLOW}[INFO]{RESET} + {len(index.fp_rules)} rule FP di {FP_RULES_FILE}:")
+                for rule in index.fp_rules.rules:
+                    print(f"   {rule.describe()}: {rule.text}")
             print(f"{RED}================================={RESET}\n")
             continue
         if event.lower() == "listdb":
-            list_events(valid_events)
+            list_events(index.names)
             continue
 
-        status, suggestions = check_event_status(event, fp_events, valid_events)
+        print_event_status(event, *check_event_status(event, index))
 
-        if status == "FP":
-            print(f"{RED}[INFO]{RESET} Event '{event}' termasuk {RED}[FALSE POSITIVE]{RESET}")
-        elif status == "VALID":
-            print(f"{GREEN}[INFO]{RESET} Event '{event}' {GREEN}BUKAN false positive (valid){RESET}")
-        elif status == "UNKNOWN":
-            print(f"{YELLOW}[WARNING]{RESET} Event '{event}' tidak ditemukan di database event list.")
-            if suggestions:
-                print(f"{GREEN}[SUGGESTION]{RESET} Mungkin maksud anda: {', '.join(suggestions)}")
+def print_event_status(event, status, suggestions):
+    if status == "FP":
+        print(f"{RED}[INFO]{RESET} Event '{event}' termasuk {RED}[FALSE POSITIVE]{RESET}")
+    elif status == "VALID":
+        print(f"{GREEN}[INFO]{RESET} Event '{event}' {GREEN}BUKAN false positive (valid){RESET}")
+    elif status == "UNKNOWN":
+        print(f"{YELLOW}[WARNING]{RESET} Event '{event}' tidak ditemukan di database event list.")
+        if suggestions:
+            print(f"{GREEN}[SUGGESTION]{RESET} Mungkin maksud anda: {', '.join(suggestions)}")
+
+def add_event_to_database(csv_file, event_name, magnitude, existing_events):
+    """Tambah satu event ke CSV. Return True kalau berhasil ditambahkan."""
+    try:
+        added, _ = event_db.add_events(csv_file, [(event_name, magnitude)])
+    except (OSError, event_db.DatabaseLockTimeout) as e:
+        print(f"{RED}[ERROR]{RESET} Gagal menambahkan event: {e}")
+        return False
+
+    if not added:
+        # duplikat dicek ulang di dalam lock: bisa saja baru ditambah analyst lain
+        print(f"{YELLOW}[WARNING]{RESET} Event '{event_name}' sudah ada di database!")
+        return False
+    print(f"{GREEN}[OK]{RESET} Event '{event_name}' (Magnitude: {magnitude}) berhasil ditambahkan!")
+    existing_events.add(normalize(event_name))  # Update set lokal
+    return True
+
+def import_events(csv_file, import_file, compact=False):
+    """Import banyak event (CSV / JSON vendor) ke database dalam satu kali tulis. Return jumlah yang ditambahkan."""
+    try:
+        events, errors = event_db.read_import_file(import_file)
+    except (OSError, ValueError) as e:
+        print(f"{RED}[ERROR]{RESET} Gagal membaca '{import_file}': {e}")
+        return 0
+    for message in errors[:10]:
+        print(f"{YELLOW}[WARNING]{RESET} {message}")
+    if len(errors) > 10:
+        print(f"{YELLOW}[WARNING]{RESET} ... dan {len(errors) - 10} entri tidak valid lainnya")
+
+    try:
+        added, duplicates = event_db.add_events(csv_file, events)
+        print(f"{GREEN}[OK]{RESET} {len(added)} event ditambahkan, {len(duplicates)} duplikat dilewati, "
+              f"{len(errors)} entri tidak valid.")
+        if compact:
+            compact_database(csv_file)
+    except (OSError, event_db.DatabaseLockTimeout) as e:
+        print(f"{RED}[ERROR]{RESET} Gagal import event: {e}")
+        return 0
+    return len(added)
+
+def compact_database(csv_file):
+    before, after = event_db.compact(csv_file)
+    print(f"{GREEN}[OK]{RESET} Database dirapikan: {before} → {after} baris (duplikat dihapus, urut per nama).")
 
 def run_mode_6():
-    csv_file = "./database/events_magnitude_list.csv"
+    from rich.prompt import Prompt
 
-    # Load event database yang sudah ada
-    existing_events = load_event_names(csv_file)
+    csv_file = EVENT_DB_FILE
+
+    # Load event database yang sudah ada (set nama ter-normalisasi → cek duplikat O(1))
+    existing_events = {normalize(name) for name in load_event_names(csv_file)}
 
     while True:
-        console.print("\n[bold cyan]Masukkan Nama Event Baru ([red]Exit[/red])[/bold cyan]")
+        console.print("\n[bold cyan]Masukkan Nama Event Baru ([green]Import <file>[/green] / "
+                      "[green]Compact[/green] / [red]Exit[/red])[/bold cyan]")
         event_name = Prompt.ask(">> ").strip()
 
         if event_name.lower() == "exit":
@@ -665,8 +1284,20 @@ def run_mode_6():
             print(f"{RED}[ERROR]{RESET} Nama event tidak boleh kosong!\n")
             continue
 
+        command, _, argument = event_name.partition(" ")
+        if command.lower() == "import" and argument.strip():
+            import_events(csv_file, argument.strip().strip('"'))
+            existing_events = {normalize(name) for name in load_event_names(csv_file)}
+            continue
+        if event_name.lower() == "compact":
+            try:
+                compact_database(csv_file)
+            except (OSError, event_db.DatabaseLockTimeout) as e:
+                print(f"{RED}[ERROR]{RESET} Gagal merapikan database: {e}")
+            continue
+
         # Cek duplikat
-        if any(event_name.lower() == e.lower() for e in existing_events):
+        if normalize(event_name) in existing_events:
             print(f"{YELLOW}[WARNING]{RESET} Event '{event_name}' sudah ada di database!")
             continue
 
@@ -681,21 +1312,206 @@ def run_mode_6():
                 print(f"{RED}[ERROR]{RESET} Magnitude harus berupa angka antara 1 sampai 10.")
 
         # Tambahkan ke CSV
+        add_event_to_database(csv_file, event_name, magnitude, existing_events)
+
+# ==================== WATCH FOLDER ====================
+WATCH_STATE_FILE = ".watch_state.json"
+WATCH_HEAD_BYTES = 4096  # sidik jari awal file untuk deteksi file diganti
+
+def file_head_digest(path, length):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read(length)).hexdigest()
+
+def load_watch_state(state_file):
+    try:
+        with open(state_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def save_watch_state(state_file, state):
+    tmp_file = state_file + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_file, state_file)
+
+def new_watch_state():
+    # files: path -> {"offset": byte terakhir yang sudah diproses, "head_len", "head"}
+    return {"files": {}, "offenses": {}, "logs": {}, "stats": {}}
+
+def watch_txt_changed(entry, path, size):
+    """False kalau file hanya bertambah (append); True kalau dipotong / diganti."""
+    if size < entry["offset"]:
+        return True
+    return file_head_digest(path, entry["head_len"]) != entry["head"]
+
+def watch_txt_once(shift, state, state_file, index, wa_template_file, store=None, dedup=None):
+    """
+    Proses record baru (append) dari semua input/*.txt.
+    Return None kalau ada file yang diganti (perlu rebuild), selain itu jumlah event baru.
+    """
+    files = state["files"]
+    offenses_count = Counter(state["offenses"])
+    logs_count = Counter(state["logs"])
+    stats = new_shift_stats(index.mag_map).load_state(state.get("stats", {}))
+    total_new = 0
+
+    for txt_file in sorted(glob.glob(os.path.join(INPUT_DIR, "*.txt"))):
+        size = os.path.getsize(txt_file)
+        entry = files.get(txt_file) or {"offset": 0, "head_len": 0, "head": file_head_digest(txt_file, 0)}
+        if watch_txt_changed(entry, txt_file, size):
+            return None
+        if size == entry["offset"]:
+            continue
+
+        while True:
+            rows, new_offset = read_appended_records(txt_file, entry["offset"])
+            if new_offset == entry["offset"]:
+                break
+            rows = read_layout(txt_file).rows(rows, skip_header=entry["offset"] == 0)
+
+            counted_before = sum(offenses_count.values()) + sum(logs_count.values())
+            events = iter_txt_rows(rows)
+            if store is not None:
+                events = store.stage(events, shift, os.path.basename(txt_file))
+            if dedup is not None:
+                events = dedup.stage(events, ticket_key)
+            events = wa_count_stage(events, offenses_count, logs_count)
+            events = stats.stage(events)
+            events = event_details_stage(events, shift, index.mag_map, WRITE_WORKERS, skip_existing=True)
+            show_false_positive_summary(*collect_false_positive(events, index))
+            total_new += sum(offenses_count.values()) + sum(logs_count.values()) - counted_before
+
+            entry["offset"] = new_offset
+            entry["head_len"] = min(new_offset, WATCH_HEAD_BYTES)
+            entry["head"] = file_head_digest(txt_file, entry["head_len"])
+            files[txt_file] = entry
+            state["offenses"] = dict(offenses_count)
+            state["logs"] = dict(logs_count)
+            state["stats"] = stats.state()
+            write_wa(offenses_count, logs_count, shift, wa_template_file, stats)
+            write_shift_stats(stats, shift)
+            save_watch_state(state_file, state)
+            if dedup is not None:
+                dedup.commit()
+
+    return total_new
+
+def watch_xml_once(shift, pending_sizes, fmt, store=None, dedup=None):
+    """XML baru diproses setelah ukurannya stabil selama satu interval (selesai dicopy)."""
+    for xml_file in glob.glob(os.path.join(INPUT_DIR, "*.xml")):
+        size = os.path.getsize(xml_file)
+        if pending_sizes.get(xml_file) != size:
+            pending_sizes[xml_file] = size
+            continue
+
+        pending_sizes.pop(xml_file)
+        xml_to_excel(xml_file, shift, fmt, store, dedup)
+        if dedup is not None:
+            dedup.commit()
         try:
-            with open(csv_file, "a", newline='', encoding="utf-8") as f:
-                writer = csv.writer(f)
-                writer.writerow([event_name, magnitude])
-            print(f"{GREEN}[OK]{RESET} Event '{event_name}' (Magnitude: {magnitude}) berhasil ditambahkan!")
-            existing_events.append(event_name)  # Update list lokal
+            os.remove(xml_file)
+            print(f"{YELLOW}[INFO]{RESET} File {xml_file} berhasil dihapus.")
         except Exception as e:
-            print(f"{RED}[ERROR]{RESET} Gagal menambahkan event: {e}")
+            print(f"{RED}[ERROR]{RESET} Gagal menghapus {xml_file}: {e}")
+
+def run_watch(shift, fp_events, interval=5.0, fmt="xlsx"):
+    """
+    Mode watch: pantau folder input/ dan proses hanya record baru.
+    Offset per file disimpan di outputs/shift{n}/.watch_state.json sehingga
+    watch bisa dihentikan dan dilanjutkan tanpa memproses ulang shift.
+    """
+    wa_template_file = os.path.join(TEMPLATE_DIR, "wa.txt")
+    if not os.path.exists(wa_template_file):
+        print(f"{RED}[ERROR]{RESET} Template WA '{wa_template_file}' tidak ditemukan!")
+        return
+    if not export_format_ready(fmt):
+        return
+
+    shift_outdir = os.path.join(OUTPUT_DIR, f"shift{shift}")
+    state_file = os.path.join(shift_outdir, WATCH_STATE_FILE)
+    state = load_watch_state(state_file)
+    if state is None:
+        clean_shift_folder(shift)
+        state = new_watch_state()
+
+    index = build_event_index(fp_events)
+    index_stamp = event_db_stamp()
+    pending_sizes = {}
+
+    print(f"{YELLOW}[INFO]{RESET} Watch folder {INPUT_DIR}/ untuk shift {shift} (CTRL+C untuk berhenti)...")
+    with open_dedup(shift) as dedup, open_event_store(USE_EVENT_STORE) as store:
+        try:
+            while True:
+                if event_db_stamp() != index_stamp:
+                    # database event / FP diubah (mode 5/6, editor) selama watch berjalan
+                    index = build_event_index(load_false_positive())
+                    index_stamp = event_db_stamp()
+                    print(f"{YELLOW}[INFO]{RESET} Database event / false positive berubah, index dimuat ulang.")
+                new_count = watch_txt_once(shift, state, state_file, index, wa_template_file, store, dedup)
+                if new_count is None:
+                    print(f"{YELLOW}[INFO]{RESET} File input diganti/dipotong, shift {shift} diproses ulang dari awal...")
+                    clean_shift_folder(shift)
+                    state = new_watch_state()
+                    continue
+                if new_count:
+                    print(f"{GREEN}[OK]{RESET} {new_count} event baru diproses.")
+
+                watch_xml_once(shift, pending_sizes, fmt, store, dedup)
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            print(f"\n{YELLOW}[INFO]{RESET} Watch dihentikan.")
+
+# ==================== EVENT STORE ====================
+def store_import(shift):
+    """Simpan semua input/*.txt dan *.xml ke event store tanpa membuat report / menghapus input."""
+    run = metrics.start_run("store", shift)
+    with open_event_store() as store:
+        for txt_file in sorted(glob.glob(os.path.join(INPUT_DIR, "*.txt"))):
+            drain(store.stage(iter_txt_file(txt_file), shift, os.path.basename(txt_file)))
+        for xml_file in sorted(glob.glob(os.path.join(INPUT_DIR, "*.xml"))):
+            columns, _ = read_offense_columns(xml_file)
+            store.insert_offenses(columns, OFFENSE_COLUMNS, shift, os.path.basename(xml_file))
+    counters = run.counters
+    print(f"{GREEN}[OK]{RESET} {counters['events_stored']} event baru disimpan "
+          f"({counters['events_already_stored']} sudah ada), {counters['offenses_stored']} offense "
+          f"→ {EVENT_STORE_FILE}")
+    finish_run_report(run)
+
+def run_query(args):
+    from utils.event_store import GROUP_COLUMNS
+
+    group_columns = list(GROUP_COLUMNS) + ["src_ip"]
+    if args.group_by and args.group_by not in group_columns:
+        print(f"{RED}[ERROR]{RESET} --group-by harus salah satu dari: {', '.join(group_columns)}")
+        return
+    if not os.path.exists(EVENT_STORE_FILE):
+        print(f"{RED}[ERROR]{RESET} Event store '{EVENT_STORE_FILE}' belum ada, jalankan store-import atau --store dulu.")
+        return
+    filters = {"event_name": args.event, "ticket_id": args.ticket, "src_ip": args.src_ip,
+               "date_from": args.since, "date_to": args.until}
+
+    with open_event_store() as store:
+        if args.offenses:
+            for row in store.query_offenses(args.event, args.limit):
+                print("\t".join(value or "-" for value in row))
+        elif args.count:
+            print(store.count_events(**filters))
+        elif args.group_by:
+            for value, count in store.count_events(args.group_by, args.limit, **filters):
+                print(f"{count}\t{value or '-'}")
+        else:
+            for row in store.query_events(args.limit, **filters):
+                print("\t".join((value or "-").replace("\n", ",") for value in row))
 
 # ==================== MAIN ====================
-if __name__ == "__main__":
-    try:
-        false_positive_events = load_false_positive()
+def interactive():
+    from rich.prompt import Prompt
 
+    try:
         while True:
+            # dimuat ulang tiap putaran (cache: hanya kalau file FP diubah selama sesi)
+            false_positive_events = load_false_positive()
             default_shift = get_default_shift()
             mode, shift = main_menu()
 
@@ -704,13 +1520,19 @@ if __name__ == "__main__":
             elif mode == "2":
                 run_mode_2(shift, false_positive_events)
             elif mode == "3":
-                run_mode_3(shift) 
+                fmt = Prompt.ask(
+                    "[bold white]Format export[/bold white]",
+                    choices=list(EXPORT_FORMATS), default="xlsx"
+                )
+                run_mode_3(shift, fmt)
             elif mode == "4":
                 run_mode_4()       
             elif mode == "5":
                 run_mode_5(false_positive_events)
             elif mode == "6":
                 run_mode_6()
+            elif mode == "7":
+                run_watch(shift, false_positive_events)
             elif mode == "99":
                 print(f"{YELLOW}[INFO]{RESET} Program dihentikan user (Exit).")
                 break
@@ -720,3 +1542,204 @@ if __name__ == "__main__":
     except KeyboardInterrupt:
         print(f"\n{YELLOW}[INFO]{RESET} Program dihentikan oleh user (CTRL+C).")
         sys.exit(0)
+
+# ==================== CLI ====================
+def read_text_arg(value):
+    """Argumen teks CLI: '@path' → isi file, '-' → stdin, selain itu teks apa adanya."""
+    if value == "-":
+        return sys.stdin.read()
+    if value.startswith("@"):
+        with open(value[1:], "r", encoding="utf-8") as f:
+            return f.read()
+    return value
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        description="SOC Event Processing Tool (tanpa argumen → menu interaktif)."
+    )
+    parser.add_argument("--input-dir", default=INPUT_DIR, help="folder input txt/xml (default: input)")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR, help="folder output (default: outputs)")
+    parser.add_argument("--metrics-prom", default=METRICS_PROM_FILE, metavar="PATH",
+                        help="tulis juga metrics run ke Prometheus textfile ini")
+    parser.add_argument("--store", action="store_true",
+                        help=f"simpan event/offense yang diproses ke event store ({EVENT_STORE_FILE})")
+    parser.add_argument("--store-file", default=EVENT_STORE_FILE, metavar="PATH", help="lokasi event store SQLite")
+    parser.add_argument("--dedup", action="store_true",
+                        help="lewati ticket/offense yang sudah dilaporkan shift sebelumnya")
+    parser.add_argument("--dedup-days", type=int, default=DEDUP_WINDOW_DAYS, metavar="N",
+                        help=f"window dedup lintas shift dalam hari (default: {DEDUP_WINDOW_DAYS})")
+    parser.add_argument("--keep-generations", type=int, default=SHIFT_RETENTION, metavar="N",
+                        help="simpan N generasi folder shift lama (default: 0, dihapus di background)")
+    parser.add_argument("--ip-table", default=IP_TABLE_FILE, metavar="PATH",
+                        help="tabel range IP format ip2asn (TSV, boleh .gz) untuk placeholder country/ASN")
+    parser.add_argument("--parse-workers", type=int, default=PARSE_WORKERS, metavar="N",
+                        help="jumlah proses parse txt untuk input besar (default: 1 = sequential)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_shift(p):
+        p.add_argument("-s", "--shift", choices=list(SHIFTS), default=None,
+                       help="kode shift (default: sesuai jam sekarang)")
+
+    def add_from_store(p):
+        p.add_argument("--from-store", metavar="YYYY-MM-DD", default=None,
+                       help="ambil event shift pada tanggal ini dari event store (tanpa input txt)")
+
+    p = sub.add_parser("wa", help="mode 1: txt → WA report")
+    add_shift(p)
+    add_from_store(p)
+
+    p = sub.add_parser("event", help="mode 2: txt → event report per event")
+    add_shift(p)
+    p.add_argument("-w", "--workers", type=int, default=WRITE_WORKERS,
+                   help=f"jumlah thread penulis file (default: {WRITE_WORKERS})")
+    p.add_argument("-b", "--bundle", action="store_true",
+                   help="tulis semua report ke satu zip (event_reports_shiftN.zip) + index")
+    add_from_store(p)
+
+    p = sub.add_parser("extract-bundle", help="extract bundle mode 2 ke layout file per event")
+    add_shift(p)
+    p.add_argument("-o", "--out", default=None, help="folder tujuan (default: outputs/shiftN)")
+    p.add_argument("--event", default=None, help="hanya report untuk event name ini")
+    p.add_argument("--ticket", default=None, help="hanya report untuk ticket id ini")
+
+    p = sub.add_parser("excel", help="mode 3: xml → excel/csv/parquet/feather")
+    add_shift(p)
+    p.add_argument("-f", "--format", choices=list(EXPORT_FORMATS), default="xlsx")
+
+    p = sub.add_parser("template", help="mode 4: buat template event")
+    p.add_argument("event_name")
+    p.add_argument("--deskripsi", required=True, help="teks, @file, atau - (stdin)")
+    p.add_argument("--mitigasi", required=True, help="teks, @file, atau - (stdin)")
+    p.add_argument("--force", action="store_true", help="timpa template yang sudah ada")
+
+    p = sub.add_parser("template-batch", help="mode 4: buat banyak template dari feed signature (CSV / JSON)")
+    p.add_argument("file", help="CSV (Event Name, Deskripsi, Mitigasi), JSON list objek, atau JSON Lines")
+    p.add_argument("--overwrite", action="store_true", help="timpa template yang sudah ada (default: skip)")
+    p.add_argument("-w", "--workers", type=int, default=WRITE_WORKERS,
+                   help=f"jumlah thread penulis file (default: {WRITE_WORKERS})")
+
+    p = sub.add_parser("watch", help="pantau folder input dan proses record baru (mode 1+2+3)")
+    add_shift(p)
+    p.add_argument("-i", "--interval", type=float, default=5.0, help="jeda polling dalam detik")
+    p.add_argument("-f", "--format", choices=list(EXPORT_FORMATS), default="xlsx")
+
+    p = sub.add_parser("check-fp", help="mode 5: cek status false positive event")
+    p.add_argument("event_names", nargs="*", help="nama event (kosong → baca per baris dari stdin)")
+
+    p = sub.add_parser("store-import", help="simpan input/*.txt dan *.xml ke event store (tanpa membuat report)")
+    add_shift(p)
+
+    p = sub.add_parser("query", help="cari / hitung event di event store")
+    p.add_argument("--event", default=None, help="event name (persis)")
+    p.add_argument("--ticket", default=None, help="ticket id")
+    p.add_argument("--src-ip", default=None, help="source IP")
+    p.add_argument("--since", default=None, metavar="YYYY-MM-DD")
+    p.add_argument("--until", default=None, metavar="YYYY-MM-DD")
+    p.add_argument("--group-by", default=None, metavar="KOLOM",
+                   help="hitung jumlah event per nilai kolom ini (kolom event store atau src_ip)")
+    p.add_argument("--count", action="store_true", help="hanya tampilkan jumlah event")
+    p.add_argument("--offenses", action="store_true", help="cari offense QRadar (--event dicocokkan ke description)")
+    p.add_argument("-n", "--limit", type=int, default=50)
+
+    p = sub.add_parser("add-event", help="mode 6: tambah event ke database")
+    p.add_argument("event_name")
+    p.add_argument("magnitude", type=int, choices=range(1, 11), metavar="magnitude(1-10)")
+
+    p = sub.add_parser("import-events", help="mode 6: import banyak event dari file CSV / JSON")
+    p.add_argument("file", help="CSV (Event Name,Magnitude) atau JSON ([{name, magnitude}] / {nama: magnitude})")
+    p.add_argument("--compact", action="store_true", help="rapikan database setelah import")
+
+    sub.add_parser("compact-db", help="hapus duplikat dan urutkan database event")
+
+    return parser
+
+def run_cli(argv):
+    global INPUT_DIR, OUTPUT_DIR, WRITE_WORKERS, METRICS_PROM_FILE, SHIFT_RETENTION
+    global USE_EVENT_STORE, EVENT_STORE_FILE, DEDUP_ENABLED, DEDUP_WINDOW_DAYS, PARSE_WORKERS
+    global IP_TABLE_FILE
+
+    args = build_arg_parser().parse_args(argv)
+    INPUT_DIR = args.input_dir
+    OUTPUT_DIR = args.output_dir
+    METRICS_PROM_FILE = args.metrics_prom
+    SHIFT_RETENTION = args.keep_generations
+    USE_EVENT_STORE = args.store
+    EVENT_STORE_FILE = args.store_file
+    DEDUP_ENABLED = args.dedup
+    DEDUP_WINDOW_DAYS = args.dedup_days
+    PARSE_WORKERS = args.parse_workers
+    IP_TABLE_FILE = args.ip_table
+    shift = getattr(args, "shift", None) or get_default_shift()
+
+    if args.command == "wa":
+        if run_mode_1(shift, load_false_positive(), from_date=args.from_store) is False:
+            return 1
+    elif args.command == "event":
+        WRITE_WORKERS = args.workers
+        if run_mode_2(shift, load_false_positive(), bundle=args.bundle, from_date=args.from_store) is False:
+            return 1
+    elif args.command == "extract-bundle":
+        path = bundle_path(shift)
+        if not os.path.exists(path):
+            print(f"{RED}[ERROR]{RESET} Bundle '{path}' tidak ditemukan!")
+            return 1
+        out_dir = args.out or os.path.dirname(path)
+        from utils.report_bundle import extract_bundle
+
+        extracted = extract_bundle(path, out_dir, args.event, args.ticket)
+        print(f"{GREEN}[OK]{RESET} {len(extracted)} report di-extract ke {out_dir}")
+    elif args.command == "excel":
+        run_mode_3(shift, args.format)
+    elif args.command == "template":
+        index = build_event_index(None)
+        event_name = index.canonical(args.event_name)
+        if not event_name:
+            print(f"{RED}[ERROR]{RESET} Event '{args.event_name}' tidak ada di database.")
+            suggestions = suggest_event(args.event_name, index)
+            if suggestions:
+                print(f"{YELLOW}[INFO]{RESET} Mungkin maksud Anda: {', '.join(suggestions)}")
+            return 1
+        created = generate_template(event_name, read_text_arg(args.deskripsi),
+                                    read_text_arg(args.mitigasi), overwrite=args.force)
+        return 0 if created else 1
+    elif args.command == "template-batch":
+        if not os.path.exists(args.file):
+            print(f"{RED}[ERROR]{RESET} File '{args.file}' tidak ditemukan!")
+            return 1
+        generate_templates_batch(args.file, build_event_index(None), overwrite=args.overwrite,
+                                 workers=args.workers)
+    elif args.command == "watch":
+        run_watch(shift, load_false_positive(), args.interval, args.format)
+    elif args.command == "check-fp":
+        index = build_event_index(load_false_positive())
+        names = args.event_names or (line.strip() for line in sys.stdin)
+        for event in names:
+            if event:
+                print_event_status(event, *check_event_status(event, index))
+    elif args.command == "store-import":
+        store_import(shift)
+    elif args.command == "query":
+        run_query(args)
+    elif args.command == "add-event":
+        csv_file = EVENT_DB_FILE
+        existing_events = {normalize(name) for name in load_event_names(csv_file)}
+        added = add_event_to_database(csv_file, args.event_name.strip(), args.magnitude, existing_events)
+        return 0 if added else 1
+    elif args.command == "import-events":
+        if not os.path.exists(args.file):
+            print(f"{RED}[ERROR]{RESET} File '{args.file}' tidak ditemukan!")
+            return 1
+        import_events(EVENT_DB_FILE, args.file, compact=args.compact)
+    elif args.command == "compact-db":
+        compact_database(EVENT_DB_FILE)
+    return 0
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        interactive()
+        return 0
+    return run_cli(argv)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+from collections.abc import Mapping
+
+# Skema kolom export IRIS (31 kolom, tab-separated): (nama field, judul kolom
+# di header export). Urutan ini juga urutan kanonik EventRecord.parts; file
+# yang memakai baris header dipetakan ke urutan ini oleh parser.log_parser.
+SCHEMA = (
+    ("event_id",            "NO"),
+    ("analyst",             "AGENT NAME"),
+    ("ticket_id",           "NO. TICKET IRIS"),
+    ("event_type",          "OFFENSES TYPE"),
+    ("reason_close",        "Reason Close Offense"),
+    ("escalation",          "Escalation"),
+    ("link_alert",          "Link Alert"),  # khusus escalation
+    ("event_name",          "ALERT NAME"),
+    ("magnitude",           "MAGNITUDE"),
+    ("tanggal",             "DATE"),
+    ("waktu",               "TIME"),
+    ("ticket_date",         "TICKET DATE"),
+    ("ticket_time",         "TICKET TIME"),
+    ("soc_response_time",   "SOC RESPONSE TIME"),
+    ("user_date",           "USER DATE"),
+    ("user_time",           "USER TIME"),
+    ("user_response_time",  "USER RESPONSE TIME"),
+    ("action",              "ACTION"),
+    ("event_status",        "EVENT STATUS"),
+    ("traffic_flow",        "TRAFFIC FLOW"),
+    ("src_ip",              "SRC IP"),
+    ("src_country",         "SRC COUNTRY"),
+    ("dst_ip",              "DST IP"),
+    ("dst_port",            "DST PORT"),
+    ("dst_country",         "DST COUNTRY"),
+    ("app_access",          "SERVICE / APP ACCESS"),
+    ("user_agent",          "USER AGENT"),
+    ("request_server",      "REQUEST SERVER"),
+    ("url",                 "URL / DNS"),
+    ("query",               "REQUEST QUERY"),
+    ("note",                "NOTE"),
+)
+
+FIELDS = tuple(name for name, _ in SCHEMA)
+
+# Field multiline yang ditampilkan vertikal (satu nilai per baris + <br>)
+VERTICAL_FIELDS = frozenset({
+    "src_ip", "src_country", "dst_ip", "dst_port", "dst_country", "url", "query", "note",
+})
+
+FIELD_INDEX = {name: idx for idx, name in enumerate(FIELDS)}
+
+
+def verticalize(raw):
+    if not raw or raw == "-":
+        return "-"
+    lines = [x.strip() for x in raw.splitlines() if x.strip()]
+    return "<br>\n".join(lines) + "<br>" if lines else "-"
+
+
+class EventRecord(Mapping):
+    """
+    Satu baris event IRIS. Hanya menyimpan list kolom hasil csv.reader;
+    nilai field (strip) dan versi vertikal field multiline baru dihitung saat
+    diakses, jadi mode yang cuma butuh event_name/event_type (WA report, cek FP)
+    tidak membayar biaya verticalize dan tidak membuat dict 31 key per baris.
+
+    Bersifat read-only Mapping sehingga tetap bisa dipakai seperti dict
+    (event["event_name"], .get(), .items(), dict(event)).
+    """
+    __slots__ = ("_parts", "_vertical")
+
+    def __init__(self, parts):
+        self._parts = parts
+        self._vertical = None  # cache field vertikal, dibuat saat pertama dipakai
+
+    def _raw(self, idx):
+        parts = self._parts
+        return parts[idx].strip() if len(parts) > idx else ""
+
+    def __getitem__(self, name):
+        idx = FIELD_INDEX[name]
+        if name not in VERTICAL_FIELDS:
+            return self._raw(idx)
+
+        cache = self._vertical
+        if cache is None:
+            cache = self._vertical = {}
+        value = cache.get(name)
+        if value is None:
+            value = cache[name] = verticalize(self._raw(idx))
+        return value
+
+    @property
+    def parts(self):
+        """List kolom mentah (belum di-strip) hasil csv.reader."""
+        return self._parts
+
+    def raw(self, name):
+        """Nilai field (strip) tanpa verticalize, field multiline tetap dipisah newline."""
+        return self._raw(FIELD_INDEX[name])
+
+    def get(self, name, default=None):
+        if name in FIELD_INDEX:
+            return self[name]
+        return default
+
+    def __contains__(self, name):
+        return name in FIELD_INDEX
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def __len__(self):
+        return len(FIELDS)
+
+    def __repr__(self):
+        return f"EventRecord(event_id={self._raw(0)!r}, event_name={self._raw(7)!r})"
@@ -1,73 +1,181 @@
-import os
-from utils.logger import log_warning
-
-# --- Fungsi membaca multiline ---
-def read_raw_multiline_manual(file_path):
-    """
-    Membaca file raw.txt yang memiliki field multiline dalam tanda kutip.
-    Menggabungkan multiline menjadi satu record utuh.
-    """
-    records = []
-    with open(file_path, "r", encoding="utf-8") as f:
-        buffer = ""
-        inside_quotes = False
-        for line in f:
-            line = line.rstrip('\n')
-            quote_count = line.count('"')
-
-            if not inside_quotes:
-                buffer = line
-                if quote_count % 2 == 1:  # mulai multiline
-                    inside_quotes = True
-                else:
-                    records.append(buffer)
-                    buffer = ""
-            else:
-                buffer += "\n" + line
-                if quote_count % 2 == 1:  # tutup multiline
-                    inside_quotes = False
-                    records.append(buffer)
-                    buffer = ""
-
-        if buffer and not inside_quotes:
-            records.append(buffer)
-    return records
-
-# --- Fungsi parsing file raw ---
-def parse_raw_file(file_path):
-    """
-    Mengubah raw.txt menjadi list of dictionaries.
-    Event name panjang dan multiline tetap dipertahankan.
-    """
-    records = read_raw_multiline_manual(file_path)
-    parsed_events = []
-
-    for record in records:
-        parts = record.split('\t')
-
-        # Minimal kolom yang penting
-        if len(parts) < 8:
-            print(f"[WARNING] Baris terlalu pendek, dilewati: {record[:50]}...")
-            continue
-
-        event = {
-            "event_id": parts[0].strip(),
-            "analyst": parts[1].strip() if len(parts) > 1 else "",
-            "ticket_id": parts[2].strip() if len(parts) > 2 else "",
-            "event_type": parts[3].strip() if len(parts) > 3 else "",
-            "event_name": parts[7].strip() if len(parts) > 7 else "",
-            "category": parts[8].strip() if len(parts) > 8 else "",
-            "magnitude": parts[9].strip() if len(parts) > 9 else "",
-            "tanggal": parts[10].strip() if len(parts) > 10 else "",
-            "waktu": parts[11].strip() if len(parts) > 11 else "",
-            "src_ip": parts[20].strip().replace('\n', ', ') if len(parts) > 20 else "",
-            "src_country": parts[21].strip().replace('\n', ', ') if len(parts) > 21 else "",
-            "dst_ip": parts[22].strip().replace('\n', ', ') if len(parts) > 22 else "",
-            "dst_port": parts[23].strip() if len(parts) > 23 else "",
-            "dst_asset": parts[24].strip() if len(parts) > 24 else "",
-            "query": parts[27].strip() if len(parts) > 27 else "",
-        }
-
-        parsed_events.append(event)
-
-    return parsed_events
+import csv
+import operator
+import os
+
+from parser.event_record import FIELDS, SCHEMA, EventRecord
+from parser.records import complete_records_end, parse_tsv_rows
+
+# Baris dengan kolom lebih sedikit dari ini bukan event (baris kosong / sisa export)
+MIN_COLUMNS = 4
+
+# Cukup untuk satu baris header; header tidak pernah multiline
+HEAD_BYTES = 64 * 1024
+RAW_BLOCK_BYTES = 8 * 1024 * 1024
+
+
+def normalize_header(text):
+    """' Alert  name ' → 'ALERT NAME' (kutip, spasi ganda dan huruf besar/kecil diabaikan)."""
+    return " ".join(text.replace('"', "").split()).upper()
+
+
+# Judul kolom (dan nama field-nya sendiri) → nama field
+HEADER_FIELDS = {}
+for _name, _title in SCHEMA:
+    HEADER_FIELDS.setdefault(normalize_header(_title), _name)
+    HEADER_FIELDS.setdefault(normalize_header(_name), _name)
+
+
+# --- Layout kolom ---
+class ColumnLayout:
+    """
+    Pemetaan kolom sebuah file ke urutan kanonik FIELDS. Extractor (itemgetter)
+    dikompilasi sekali per file; file tanpa header atau dengan header yang
+    urutannya sudah kanonik tidak di-remap sama sekali, jadi jalur umum tetap
+    secepat csv.reader biasa.
+    """
+    __slots__ = ("columns", "header", "_remap")
+
+    def __init__(self, columns=None, header=False):
+        # columns[i] = index kolom file untuk FIELDS[i] (None = tidak ada di file)
+        self.columns = tuple(columns) if columns is not None else tuple(range(len(FIELDS)))
+        self.header = header
+        self._remap = None if self.columns == tuple(range(len(FIELDS))) else self._compile()
+
+    def _compile(self):
+        present = [c for c in self.columns if c is not None]
+        # kolom yang tidak ada diambil dari elemen terakhir padding (selalu "")
+        getter = operator.itemgetter(*(c if c is not None else -1 for c in self.columns))
+        pad = [""] * (max(present, default=0) + 2)
+
+        def remap(parts):
+            if len(parts) < MIN_COLUMNS:
+                return parts
+            return list(getter(parts + pad))
+        return remap
+
+    @property
+    def missing(self):
+        return [name for name, col in zip(FIELDS, self.columns) if col is None]
+
+    def rows(self, rows, skip_header=False):
+        """
+        Baris kolom file → baris dalam urutan kanonik. skip_header=True kalau
+        `rows` dimulai dari awal file (baris header dibuang).
+        """
+        rows = iter(rows)
+        if skip_header and self.header:
+            next(rows, None)
+        if self._remap is None:
+            return rows
+        return map(self._remap, rows)
+
+
+DEFAULT_LAYOUT = ColumnLayout()
+
+
+def detect_layout(first_row):
+    """
+    Baris pertama file → ColumnLayout. Dianggap header kalau minimal 3 kolom
+    dan setidaknya separuh kolom yang terisi dikenali sebagai judul kolom
+    SCHEMA; selain itu file dianggap memakai urutan kanonik tanpa header.
+    """
+    if not first_row:
+        return DEFAULT_LAYOUT
+    names = [HEADER_FIELDS.get(normalize_header(cell)) for cell in first_row]
+    filled = sum(1 for cell in first_row if cell.strip())
+    known = sum(1 for name in names if name)
+    if known < 3 or known * 2 < filled:
+        return DEFAULT_LAYOUT
+
+    position = {}
+    for col, name in enumerate(names):
+        if name and name not in position:
+            position[name] = col
+    return ColumnLayout([position.get(name) for name in FIELDS], header=True)
+
+
+def read_layout(file_path):
+    """Deteksi layout dari record pertama file (hanya membaca awal file)."""
+    with open(file_path, "rb") as f:
+        head = f.read(HEAD_BYTES)
+    end = complete_records_end(head) or len(head)
+    first = next(parse_tsv_rows(head[:end].decode("utf-8", errors="replace")), None)
+    return detect_layout(first)
+
+
+# --- Parser utama ---
+def iter_file_rows(file_path):
+    """
+    Generator: baris kolom file export IRIS dalam urutan kanonik FIELDS
+    (header otomatis dikenali dan dibuang), tanpa menampung seluruh file.
+    Dipakai semua jalur parse (mode 1/2, event store, parse paralel, watch).
+    """
+    layout = read_layout(file_path)
+    with open(file_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f, delimiter="\t", quotechar='"')
+        yield from layout.rows(reader, skip_header=True)
+
+
+def iter_raw_records(file_path):
+    """
+    Generator: record mentah (string, kutip tetap ada) dari file export yang
+    memiliki field multiline dalam tanda kutip. File di-mmap dan di-decode per
+    blok ~RAW_BLOCK_BYTES yang dipotong di newline; baris satu record
+    multiline dikumpulkan di list lalu di-join sekali, bukan disambung
+    berulang (buffer +=).
+    """
+    import mmap
+
+    size = os.path.getsize(file_path)
+    if size == 0:
+        return
+    with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        buffer = []
+        inside_quotes = False
+        pos = 0
+        while pos < size:
+            end = size
+            if pos + RAW_BLOCK_BYTES < size:
+                # potong di newline terakhir blok (baris lebih panjang dari blok → newline berikutnya)
+                end = data.rfind(b"\n", pos, pos + RAW_BLOCK_BYTES) + 1
+                if not end:
+                    end = data.find(b"\n", pos + RAW_BLOCK_BYTES) + 1 or size
+            text = data[pos:end].decode("utf-8")
+            pos = end
+            if "\r" in text:
+                text = text.replace("\r\n", "\n")
+            lines = text.split("\n")
+            if text.endswith("\n"):
+                lines.pop()
+
+            for line in lines:
+                odd = line.count('"') % 2
+                if not inside_quotes:
+                    if odd:  # mulai multiline
+                        buffer = [line]
+                        inside_quotes = True
+                    else:
+                        yield line
+                else:
+                    buffer.append(line)
+                    if odd:  # tutup multiline
+                        inside_quotes = False
+                        yield "\n".join(buffer)
+        # record terakhir dengan kutip yang tidak pernah ditutup dibuang (export terpotong)
+
+
+# --- API lama ---
+def read_raw_multiline_manual(file_path):
+    """
+    Membaca file raw.txt yang memiliki field multiline dalam tanda kutip.
+    Menggabungkan multiline menjadi satu record utuh.
+    """
+    return list(iter_raw_records(file_path))
+
+
+def parse_raw_file(file_path):
+    """
+    Mengubah raw.txt menjadi list EventRecord (dict-like, key = FIELDS), hasil
+    parser yang sama dengan main.py. Baris yang terlalu pendek dilewati.
+    """
+    return [EventRecord(parts) for parts in iter_file_rows(file_path) if len(parts) >= MIN_COLUMNS]
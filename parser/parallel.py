@@ -0,0 +1,162 @@
+import os
+from collections import deque
+from itertools import chain
+
+from parser.log_parser import read_layout
+from parser.records import complete_records_end, parse_tsv_rows
+
+CHUNK_BYTES = 32 * 1024 * 1024
+
+# Pemisah saat hasil parse dikirim balik dari worker: satu string besar jauh
+# lebih murah di-pickle daripada list berisi jutaan string kecil.
+RECORD_SEP = "\x1e"
+FIELD_SEP = "\x1f"
+
+# Record penanda yang ditempel worker di akhir chunk: kalau chunk terpotong
+# di dalam field berkutip, penanda ini ikut tertelan field tersebut.
+CHECK_FIELD = "\x1dchunk-end"
+
+
+def record_chunks(file_path, chunk_bytes=CHUNK_BYTES, start=0, exact=False):
+    """
+    Bagi file (mulai byte `start`, harus batas record) menjadi range byte
+    (start, end) sekitar `chunk_bytes` yang berakhir tepat setelah newline.
+
+    Default batas dicari cepat dengan menghitung paritas tanda kutip per
+    blok; hasilnya kandidat yang diverifikasi worker (parse_range), karena
+    kutip nyasar di tengah field biasa (user_agent, url) bisa membalik
+    paritas. exact=True → batas dicari dengan complete_records_end (sama
+    dengan csv.reader, lebih lambat), dipakai setelah verifikasi gagal.
+    """
+    size = os.path.getsize(file_path)
+    pos = start
+    in_quotes = False  # status kutip di posisi `pos`
+    read_bytes = chunk_bytes
+    with open(file_path, "rb") as f:
+        while pos < size:
+            f.seek(pos)
+            data = f.read(read_bytes)
+            if pos + len(data) >= size:
+                break
+
+            if exact:
+                boundary = complete_records_end(data) or None
+                end_quotes = False
+            else:
+                end_quotes = in_quotes ^ bool(data.count(b'"') & 1)
+                # cari mundur newline terakhir yang berada di luar kutip
+                boundary = None
+                cut = len(data)
+                quotes = end_quotes  # status kutip di posisi `cut`
+                while True:
+                    nl = data.rfind(b"\n", 0, cut)
+                    if nl < 0:
+                        break
+                    quotes ^= bool(data.count(b'"', nl + 1, cut) & 1)
+                    if not quotes:
+                        boundary = nl + 1
+                        break
+                    cut = nl
+
+            if boundary is None:
+                # satu record lebih panjang dari chunk → gabung dengan blok berikutnya
+                if exact:
+                    read_bytes *= 2
+                else:
+                    pos += len(data)
+                    in_quotes = end_quotes
+                continue
+
+            yield start, pos + boundary
+            start = pos = pos + boundary
+            in_quotes = False
+            read_bytes = chunk_bytes
+
+    if start < size:
+        yield start, size
+
+
+def parse_range(file_path, start, end, last=False):
+    """
+    Dijalankan di worker: parse satu range record, kembalikan hasil dalam
+    bentuk ringkas. Return None kalau range tidak berakhir di batas record
+    (kandidat batas dari record_chunks salah).
+    """
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8")
+
+    if last:
+        rows = parse_tsv_rows(text)
+    else:
+        # verifikasi gratis: record penanda hanya muncul utuh sebagai baris
+        # terakhir kalau akhir chunk berada di luar field berkutip
+        rows = list(parse_tsv_rows(text + CHECK_FIELD))
+        if not rows or rows[-1] != [CHECK_FIELD]:
+            return None
+        rows.pop()
+
+    # header dibuang di chunk pertama, kolom dipetakan ke urutan kanonik di worker
+    rows = read_layout(file_path).rows(rows, skip_header=start == 0)
+    if RECORD_SEP in text or FIELD_SEP in text:
+        return list(rows)  # jarang: data berisi karakter pemisah, kirim apa adanya
+    return RECORD_SEP.join(FIELD_SEP.join(row) for row in rows)
+
+
+def unpack_rows(result):
+    if isinstance(result, list):
+        return result
+    if not result:
+        return []
+    return [record.split(FIELD_SEP) for record in result.split(RECORD_SEP)]
+
+
+def file_tasks(file_no, file_path, chunk_bytes, start=0, exact=False):
+    size = os.path.getsize(file_path)
+    for chunk_start, chunk_end in record_chunks(file_path, chunk_bytes, start, exact):
+        yield file_no, file_path, chunk_start, chunk_end, chunk_end >= size
+
+
+def iter_parallel_chunks(file_paths, workers, chunk_bytes=CHUNK_BYTES):
+    """
+    Parse beberapa file sekaligus di process pool, lintas file dan di dalam
+    satu file. Yield (file_path, rows) per chunk sesuai urutan asli, jadi
+    hasilnya sama dengan membaca semua file berurutan dengan iter_file_rows.
+    Jumlah chunk yang sedang diproses dibatasi supaya memori tetap datar.
+
+    Chunk yang ditolak worker (batas kandidat jatuh di dalam field berkutip)
+    tidak dipakai: sisa file tersebut dipotong ulang dengan batas exact
+    mulai dari awal chunk itu (batas record yang sudah terverifikasi), dan
+    chunk file lain yang sudah terlanjur dikirim diantrekan ulang.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    tasks = chain.from_iterable(
+        file_tasks(file_no, path, chunk_bytes) for file_no, path in enumerate(file_paths)
+    )
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+
+        def submit_next():
+            task = next(tasks, None)
+            if task is not None:
+                pending.append((task, pool.submit(parse_range, *task[1:])))
+
+        for _ in range(workers * 2):
+            submit_next()
+        while pending:
+            task, future = pending.popleft()
+            result = future.result()
+            if result is None:
+                file_no, path, start = task[:3]
+                requeue = [queued for queued, _ in pending if queued[0] != file_no]
+                for _, queued_future in pending:
+                    queued_future.cancel()
+                pending.clear()
+                remaining = (queued for queued in tasks if queued[0] != file_no)
+                tasks = chain(file_tasks(file_no, path, chunk_bytes, start, exact=True), requeue, remaining)
+                for _ in range(workers * 2):
+                    submit_next()
+                continue
+            submit_next()
+            yield task[1], unpack_rows(result)
@@ -0,0 +1,59 @@
+import csv
+import io
+import re
+
+
+# Field berkutip, sama dengan dialect csv.reader: tanda kutip hanya membuka
+# field berkutip kalau berada di awal field (awal data / setelah tab /
+# newline); kutip di tengah field biasa (user_agent, url, query) adalah
+# karakter literal. "" di dalam field = kutip literal. Field yang belum
+# ditutup sampai akhir data ikut cocok, dengan group 1 kosong.
+_QUOTED_FIELD = re.compile(rb'"(?<![^\t\n\r]")[^"]*(?:""[^"]*)*(?:(")|\Z)')
+
+
+def complete_records_end(data):
+    """
+    Offset tepat setelah newline terakhir yang menutup record lengkap,
+    yaitu newline yang berada di luar field berkutip (field multiline IRIS).
+    `data` harus dimulai di batas record. Return 0 kalau belum ada record
+    lengkap di `data`.
+    """
+    end = 0
+    pos = 0
+    for m in _QUOTED_FIELD.finditer(data):
+        nl = data.rfind(b"\n", pos, m.start())
+        if nl >= 0:
+            end = nl + 1
+        if m.group(1) is None:
+            return end  # kutip belum ditutup: record masih ditulis
+        pos = m.end()
+    nl = data.rfind(b"\n", pos)
+    return nl + 1 if nl >= 0 else end
+
+
+def parse_tsv_rows(text):
+    """Pecah teks TSV (boleh berisi field multiline berkutip) menjadi list kolom per baris."""
+    return csv.reader(io.StringIO(text, newline=""), delimiter="\t", quotechar='"')
+
+
+def read_appended_records(file_path, offset, max_bytes=32 * 1024 * 1024):
+    """
+    Baca record baru di `file_path` mulai byte `offset` (harus batas record),
+    paling banyak sekitar `max_bytes` per panggilan. Record terakhir yang belum
+    lengkap (masih ditulis / kutip belum ditutup) ditunda ke pembacaan berikutnya.
+    Return: (iterator baris kolom, offset baru) — offset sama berarti tidak ada record baru.
+    """
+    with open(file_path, "rb") as f:
+        f.seek(offset)
+        data = f.read(max_bytes)
+        end = complete_records_end(data)
+        # satu record lebih besar dari max_bytes → terus baca sampai lengkap
+        while not end:
+            more = f.read(max_bytes)
+            if not more:
+                return iter(()), offset
+            data += more
+            end = complete_records_end(data)
+
+    text = data[:end].decode("utf-8")
+    return parse_tsv_rows(text), offset + end
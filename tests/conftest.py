@@ -0,0 +1,28 @@
+import csv
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def make_export(tmp_path):
+    """
+    Factory export TSV sintetis: field multiline berkutip tiap 7 baris dan
+    satu user_agent dengan kutip nyasar di baris 150. Return (path, rows
+    hasil csv.reader) sebagai pembanding.
+    """
+    def make(name="export.txt", rows=300):
+        path = tmp_path / name
+        lines = []
+        for i in range(rows):
+            agent = 'Mozilla/5.0 "compatible bot' if i == 150 else "curl/8.0"
+            note = '"baris 1\nbaris 2"' if i % 7 == 0 else "-"
+            lines.append(f"{i}\tanalyst\tT{i}\tLog Activity\t{agent}\t{note}\n")
+        path.write_text("".join(lines), encoding="utf-8")
+        with open(path, newline="", encoding="utf-8") as f:
+            return path, list(csv.reader(f, delimiter="\t", quotechar='"'))
+
+    return make
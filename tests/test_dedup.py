@@ -0,0 +1,27 @@
+from datetime import datetime
+
+import main
+from utils.dedup_index import DedupIndex
+
+
+def test_shift_date_follows_shift_window():
+    assert main.shift_date("2", datetime(2024, 5, 1, 23, 30)) == "2024-05-01"
+    assert main.shift_date("2", datetime(2024, 5, 2, 0, 30)) == "2024-05-01"
+    assert main.shift_date("3", datetime(2024, 5, 2, 0, 30)) == "2024-05-02"
+    assert main.shift_date("1", datetime(2024, 5, 2, 12, 0)) == "2024-05-02"
+
+
+def test_rerun_after_midnight_keeps_same_run(tmp_path):
+    path = str(tmp_path / "dedup.sqlite3")
+    keys = ["Event A_T1_Offensess", "Event B_T2_Log Activity"]
+
+    before = f"{main.shift_date('2', datetime(2024, 5, 1, 23, 30))}-shift2"
+    with DedupIndex(path, before) as dedup:
+        assert dedup.check_many(keys) == [False, False]
+
+    after = f"{main.shift_date('2', datetime(2024, 5, 2, 0, 30))}-shift2"
+    with DedupIndex(path, after) as dedup:
+        assert dedup.check_many(keys) == [False, False]
+
+    with DedupIndex(path, "2024-05-02-shift3") as dedup:
+        assert dedup.check_many(keys) == [True, True]
@@ -0,0 +1,58 @@
+import difflib
+import random
+import time
+
+from utils.event_index import EventIndex, LcsBounds
+
+NAMES = [
+    "Custom Rule Engine Message", "utm redirect", "Nmap Scripting Engine Detection",
+    "Nmap Service Detection", "Non-RFC Compliant DNS Traffic on Port 53/5353",
+    "Non-RFC Compliant SSL Traffic on Port 443", "WordPress Authentication Bypass Vulnerability",
+    "Possible HTTP Malicious Payload Detection", "DNS flood IPv4 DNS-OTHER", "ENV File Scanning Attempt",
+]
+
+
+def lcs_length(a, b):
+    prev = [0] * (len(b) + 1)
+    for ca in a:
+        cur = [0]
+        for j, cb in enumerate(b):
+            cur.append(prev[j] + 1 if ca == cb else max(prev[j + 1], cur[j]))
+        prev = cur
+    return prev[-1]
+
+
+def test_lcs_bounds_match_dynamic_programming():
+    names = [name.lower() for name in NAMES] + ["", "abcdefgh"]
+    bounds = LcsBounds(names)
+    for query in ("nmap servce detektion", "abcbdab", "custom rule vendor x", "a" * 20):
+        assert bounds.lengths(query) == [lcs_length(query, name) for name in names]
+
+
+def test_lcs_bounds_with_many_distinct_characters():
+    # lebih dari 255 karakter berbeda → mask dibangun dalam beberapa batch
+    alphabet = [chr(code) for code in range(0x400, 0x400 + 300)] + list("abc é")
+    rng = random.Random(7)
+    names = ["".join(rng.choices(alphabet, k=rng.randint(0, 30))) for _ in range(40)]
+    bounds = LcsBounds(names)
+    for query in names[:5] + ["abc", "".join(rng.choices(alphabet, k=25))]:
+        assert bounds.lengths(query) == [lcs_length(query, name) for name in names]
+
+
+def test_index_build_scales_to_30k_names():
+    rng = random.Random(1)
+    words = ["".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=rng.randint(3, 9))) for _ in range(3000)]
+    names = [" ".join(rng.choices(words, k=rng.randint(2, 7))).title() for _ in range(30000)]
+    index = EventIndex(names)
+    start = time.perf_counter()
+    index.suggest("zzqx vendor signature")  # build trigram + LcsBounds, lalu satu query fuzzy
+    assert time.perf_counter() - start < 5.0
+
+
+def test_fuzzy_suggestions_match_difflib():
+    index = EventIndex(NAMES)
+    lowered = [name.lower() for name in NAMES]
+    for query in ("Custom Rule Vendor X", "nmap servce detektion", "non rfc complant dns trafic",
+                  "wordpres auth bypas", "dns flod ipv4"):
+        expected = difflib.get_close_matches(query.lower(), lowered, n=3, cutoff=0.5)
+        assert [name.lower() for name in index.suggest(query)] == expected
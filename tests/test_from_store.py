@@ -0,0 +1,28 @@
+import main
+from utils.event_store import EventStore
+
+# global yang di-set run_cli; di-monkeypatch supaya dikembalikan setelah test
+CLI_GLOBALS = ("INPUT_DIR", "OUTPUT_DIR", "WRITE_WORKERS", "METRICS_PROM_FILE", "SHIFT_RETENTION", "USE_EVENT_STORE",
+               "EVENT_STORE_FILE", "DEDUP_ENABLED", "DEDUP_WINDOW_DAYS", "PARSE_WORKERS", "IP_TABLE_FILE")
+
+
+def test_from_store_without_store_keeps_previous_output(tmp_path, monkeypatch):
+    store_file = tmp_path / "event_store.sqlite3"
+    shift_dir = tmp_path / "outputs" / "shift1"
+    shift_dir.mkdir(parents=True)
+    (shift_dir / "wa_shift1.txt").write_text("report lama", encoding="utf-8")
+    for name in CLI_GLOBALS:
+        monkeypatch.setattr(main, name, getattr(main, name))
+    monkeypatch.setattr(main, "EVENT_STORE_FILE", str(store_file))
+    monkeypatch.setattr(main, "OUTPUT_DIR", str(tmp_path / "outputs"))
+
+    assert main.run_mode_2("1", set(), from_date="2024-05-01") is False
+    assert not store_file.exists()
+    assert main.run_cli(["--store-file", str(store_file), "--output-dir", str(tmp_path / "outputs"),
+                         "event", "-s", "1", "--from-store", "2024-05-01"]) == 1
+    assert not store_file.exists()
+
+    EventStore(str(store_file)).close()  # store ada, tapi tanpa event tanggal itu
+    assert main.run_mode_1("1", set(), from_date="2024-05-01") is False
+    assert sorted(p.name for p in shift_dir.iterdir()) == ["wa_shift1.txt"]
+    assert (shift_dir / "wa_shift1.txt").read_text(encoding="utf-8") == "report lama"
@@ -0,0 +1,34 @@
+import sys
+
+import pytest
+
+import utils.offense_export as offense_export
+from utils.offense_export import ExportDependencyError, export_offenses, missing_dependency
+
+
+def test_csv_export(tmp_path):
+    out_file = export_offenses({"id": ["1", "2"], "magnitude": ["5", "7"]}, ["id", "magnitude"],
+                               tmp_path / "offenses", "csv")
+    with open(out_file, encoding="utf-8-sig") as f:
+        assert f.read().splitlines() == ["id,magnitude", "1,5", "2,7"]
+
+
+def test_missing_pyarrow_is_reported_before_writing(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    assert missing_dependency("parquet") == "pyarrow"
+    assert missing_dependency("csv") is None
+    with pytest.raises(ExportDependencyError, match="pyarrow"):
+        export_offenses({"id": ["1"]}, ["id"], tmp_path / "offenses", "parquet")
+    assert not list(tmp_path.iterdir())
+
+
+def test_import_error_in_writer_leaves_no_partial_file(tmp_path, monkeypatch):
+    def broken_writer(columns, column_names, out_file):
+        open(out_file, "wb").close()
+        raise ImportError("No module named 'pyarrow'", name="pyarrow")
+
+    monkeypatch.setitem(offense_export.EXPORT_FORMATS, "feather", (".feather", broken_writer, "pyarrow"))
+    monkeypatch.setattr(offense_export, "missing_dependency", lambda fmt: None)
+    with pytest.raises(ExportDependencyError, match="format feather membutuhkan pyarrow"):
+        export_offenses({"id": ["1"]}, ["id"], tmp_path / "offenses", "feather")
+    assert not list(tmp_path.iterdir())
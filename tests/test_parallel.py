@@ -0,0 +1,20 @@
+from parser.log_parser import iter_file_rows
+from parser.parallel import iter_parallel_chunks, record_chunks
+
+
+def test_exact_chunks_end_on_record_boundaries(make_export):
+    path, _ = make_export()
+    chunks = list(record_chunks(str(path), 512, exact=True))
+    assert chunks[0][0] == 0 and chunks[-1][1] == path.stat().st_size
+    assert all(a[1] == b[0] for a, b in zip(chunks, chunks[1:]))
+
+
+def test_parallel_rows_match_sequential_with_stray_quote(make_export):
+    path, _ = make_export()
+    other, _ = make_export("other.txt", rows=40)
+    expected = [(str(p), row) for p in (path, other) for row in iter_file_rows(str(p))]
+
+    for chunk_bytes in (512, 2048, 8192):
+        rows = [(p, row) for p, chunk in iter_parallel_chunks([str(path), str(other)], 2, chunk_bytes)
+                for row in chunk]
+        assert rows == expected
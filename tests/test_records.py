@@ -0,0 +1,24 @@
+from parser.records import complete_records_end, read_appended_records
+
+
+def test_quote_inside_unquoted_field_is_literal():
+    data = b'1\tMozilla "5.0\tx\n2\ty\tz\n'
+    assert complete_records_end(data) == len(data)
+
+
+def test_open_quoted_field_waits_for_closing_quote():
+    assert complete_records_end(b'1\ta\n2\t"multi\nline') == 4
+    assert complete_records_end(b'1\t"a ""quoted""\nline"\n') == 22
+
+
+def test_incremental_reads_match_csv_reader(make_export):
+    path, expected = make_export()
+    size = path.stat().st_size
+
+    rows, offset = [], 0
+    while offset < size:
+        chunk, new_offset = read_appended_records(str(path), offset, max_bytes=512)
+        assert new_offset > offset
+        rows.extend(chunk)
+        offset = new_offset
+    assert rows == expected
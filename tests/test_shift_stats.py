@@ -0,0 +1,25 @@
+from parser.event_record import FIELD_INDEX, FIELDS, EventRecord
+from utils.shift_stats import ShiftStats
+
+
+def make_event(**values):
+    parts = [""] * len(FIELDS)
+    for name, value in values.items():
+        parts[FIELD_INDEX[name]] = value
+    return EventRecord(parts)
+
+
+def test_top_counts_each_event_once_per_value():
+    events = [
+        make_event(src_ip="10.0.0.1\n10.0.0.1\n10.0.0.2", dst_port="443\n80\n443", src_country="ID"),
+        make_event(src_ip="10.0.0.1", dst_port="443", src_country="ID\r\nSG"),
+        make_event(src_ip="-", dst_port="", src_country="-"),
+    ]
+    stats = ShiftStats(batch_size=2)
+    assert list(stats.stage(events)) == events
+
+    assert stats.total == 3
+    assert stats.src_ip == {"10.0.0.1": 2, "10.0.0.2": 1}
+    assert stats.dst_port == {"443": 2, "80": 1}
+    assert stats.src_country == {"ID": 2, "SG": 1}
+    assert stats.placeholders()["top_src_ip"] == "1. 10.0.0.1 (2 events)\n2. 10.0.0.2 (1 events)"
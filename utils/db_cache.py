@@ -0,0 +1,87 @@
+import os
+
+# Snapshot biner hasil parse (hanya untuk loader yang mahal, mis. tabel IP)
+SNAPSHOT_DIR = os.path.join("database", ".cache")
+SNAPSHOT_VERSION = 1
+
+
+def file_stamp(path):
+    """(mtime_ns, size) file, atau None kalau file tidak ada."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class FileCache:
+    """
+    Cache hasil parse file di database/ (CSV event + magnitude, daftar FP,
+    rule FP, tabel IP), sama seperti TemplateCache: file hanya di-parse ulang
+    kalau mtime/size berubah, jadi perubahan selama sesi (mode interaktif,
+    watch) langsung terpakai tanpa membaca ulang file yang sama.
+
+    snapshot=True → hasil parse juga disimpan sebagai pickle di SNAPSHOT_DIR
+    dan dipakai di proses berikutnya selama file sumbernya tidak berubah.
+    """
+
+    def __init__(self, snapshot_dir=SNAPSHOT_DIR):
+        self.snapshot_dir = snapshot_dir
+        self._entries = {}  # (loader, path) -> (stamp, value)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path, loader, snapshot=False):
+        """Hasil loader(path) untuk versi file saat ini (file tidak ada → loader tetap dipanggil sekali)."""
+        name = getattr(loader, "__qualname__", repr(loader))
+        key = (name, os.path.abspath(path))
+        stamp = file_stamp(path)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == stamp:
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        value = None
+        use_snapshot = snapshot and stamp is not None and self.snapshot_dir
+        if use_snapshot:
+            value = self._read_snapshot(path, name, stamp)
+        if value is None:
+            value = loader(path)
+            if use_snapshot:
+                self._write_snapshot(path, name, stamp, value)
+        self._entries[key] = (stamp, value)
+        return value
+
+    def _snapshot_path(self, path, name):
+        return os.path.join(self.snapshot_dir, f"{os.path.basename(path)}.{name}.pickle")
+
+    def _read_snapshot(self, path, name, stamp):
+        import pickle
+
+        try:
+            with open(self._snapshot_path(path, name), "rb") as f:
+                version, source, snap_stamp, value = pickle.load(f)
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return None
+        if version != SNAPSHOT_VERSION or source != os.path.abspath(path) or tuple(snap_stamp) != stamp:
+            return None
+        return value
+
+    def _write_snapshot(self, path, name, stamp, value):
+        """Snapshot gagal ditulis (read-only, disk penuh) bukan error: run berikutnya parse ulang."""
+        import pickle
+
+        target = self._snapshot_path(path, name)
+        tmp_file = f"{target}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            with open(tmp_file, "wb") as f:
+                pickle.dump((SNAPSHOT_VERSION, os.path.abspath(path), stamp, value), f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, target)
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            try:
+                os.unlink(tmp_file)
+            except OSError:
+                pass
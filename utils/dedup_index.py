@@ -0,0 +1,136 @@
+import hashlib
+import os
+import sqlite3
+import time
+
+from utils import metrics
+
+BATCH_SIZE = 500  # di bawah batas 999 parameter SQLite lama
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen (
+    key INTEGER PRIMARY KEY,   -- hash 64-bit dari key ticket/offense
+    run_id TEXT NOT NULL,      -- run pertama yang melaporkan key ini (tanggal + shift)
+    first_seen REAL NOT NULL   -- epoch detik
+);
+CREATE INDEX IF NOT EXISTS idx_seen_first ON seen (first_seen);
+"""
+
+
+def key_hash(text):
+    """Key string → integer 64-bit (signed, sesuai INTEGER SQLite)."""
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big", signed=True)
+
+
+class DedupIndex:
+    """
+    Index ticket/offense yang sudah dilaporkan, disimpan di SQLite dan dipakai
+    bersama mode 1, 2 dan 3. Key yang sudah dilaporkan oleh run lain (tanggal +
+    shift berbeda) dalam `window_days` terakhir dianggap duplikat. Run yang
+    sama boleh diulang tanpa kehilangan report.
+
+    Hanya hash 64-bit per key yang disimpan; lookup lewat primary key (per
+    batch), jadi riwayat tidak perlu dimuat ke memori. Perubahan baru di-commit kalau run
+    selesai (commit), run yang gagal tidak menandai apa pun.
+    """
+
+    def __init__(self, path, run_id, window_days=7, max_entries=500_000):
+        self.path = path
+        self.run_id = run_id
+        self.window = window_days * 86400
+        self.max_entries = max_entries
+        self.now = time.time()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def check_many(self, keys):
+        """
+        List bool (duplikat?) untuk setiap key; key None tidak pernah duplikat.
+        Key yang bukan duplikat dicatat untuk run ini. Lookup satu query
+        `IN (...)` per batch, bukan satu query per event.
+        """
+        hashes = [None if key is None else key_hash(key) for key in keys]
+        pending = list({h for h in hashes if h is not None})
+        found = {}
+        for i in range(0, len(pending), BATCH_SIZE):
+            chunk = pending[i:i + BATCH_SIZE]
+            rows = self.conn.execute(
+                f"SELECT key, run_id, first_seen FROM seen WHERE key IN ({', '.join('?' * len(chunk))})", chunk)
+            found.update((h, (run_id, first_seen)) for h, run_id, first_seen in rows)
+
+        expired_before = self.now - self.window
+        duplicate = {}
+        new_rows = []
+        for h in pending:
+            row = found.get(h)
+            duplicate[h] = row is not None and row[0] != self.run_id and row[1] >= expired_before
+            if not duplicate[h] and (row is None or row[0] != self.run_id):
+                # key baru, atau catatan lama yang sudah kedaluwarsa
+                new_rows.append((h, self.run_id, self.now))
+        if new_rows:
+            self.conn.executemany("INSERT OR REPLACE INTO seen (key, run_id, first_seen) VALUES (?, ?, ?)", new_rows)
+        return [h is not None and duplicate[h] for h in hashes]
+
+    def is_duplicate(self, key):
+        return self.check_many([key])[0]
+
+    def stage(self, events, key_func):
+        """
+        Streaming stage: buang event yang key-nya sudah dilaporkan run sebelumnya.
+        key_func(event) → key string, atau None kalau event tidak perlu di-dedup.
+        Event ditahan per batch (BATCH_SIZE) supaya lookup bisa digabung.
+        """
+        skipped = 0
+        elapsed = 0.0
+        batch = []
+        try:
+            for e in events:
+                batch.append(e)
+                if len(batch) < BATCH_SIZE:
+                    continue
+                start = time.perf_counter()
+                flags = self.check_many([key_func(item) for item in batch])
+                elapsed += time.perf_counter() - start
+                skipped += flags.count(True)
+                yield from (item for item, duplicate in zip(batch, flags) if not duplicate)
+                batch = []
+
+            start = time.perf_counter()
+            flags = self.check_many([key_func(item) for item in batch])
+            elapsed += time.perf_counter() - start
+            skipped += flags.count(True)
+            yield from (item for item, duplicate in zip(batch, flags) if not duplicate)
+        finally:
+            metrics.current.add_time("dedup", elapsed)
+            metrics.current.count("duplicates_skipped", skipped)
+
+    def prune(self):
+        """Buang key di luar window, lalu batasi jumlah entry (yang paling lama dibuang)."""
+        self.conn.execute("DELETE FROM seen WHERE first_seen < ?", (self.now - self.window,))
+        excess = self.conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0] - self.max_entries
+        if excess > 0:
+            self.conn.execute(
+                "DELETE FROM seen WHERE key IN (SELECT key FROM seen ORDER BY first_seen LIMIT ?)", (excess,))
+
+    def commit(self):
+        self.prune()
+        self.conn.commit()
+
+    def rollback(self):
+        self.conn.rollback()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        self.close()
+        return False
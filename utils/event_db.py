@@ -0,0 +1,191 @@
+import csv
+import io
+import json
+import os
+import time
+from contextlib import contextmanager
+
+from utils.event_index import normalize
+
+HEADER = ["Event Name", "Magnitude"]
+NAME_COLUMNS = ("event name", "event_name", "name")  # nama kolom di file import vendor
+LOCK_TIMEOUT = 30.0  # detik menunggu analyst lain selesai menulis
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class DatabaseLockTimeout(RuntimeError):
+    pass
+
+
+@contextmanager
+def locked(csv_file, timeout=LOCK_TIMEOUT):
+    """
+    Lock eksklusif antar proses untuk database event (file `<csv>.lock`),
+    supaya dua analyst yang menambah event bersamaan tidak saling menimpa.
+    """
+    lock_path = csv_file + ".lock"
+    os.makedirs(os.path.dirname(lock_path) or ".", exist_ok=True)
+    deadline = time.monotonic() + timeout
+    with open(lock_path, "a+b") as f:
+        while True:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                break
+            except OSError:
+                if time.monotonic() >= deadline:
+                    raise DatabaseLockTimeout(f"database '{csv_file}' sedang dipakai proses lain")
+                time.sleep(0.05)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _read_text(csv_file):
+    try:
+        with open(csv_file, "r", newline="", encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return ""
+
+
+def _read_rows(text):
+    rows = list(csv.reader(io.StringIO(text)))
+    if rows and [c.strip() for c in rows[0]] == HEADER:
+        rows = rows[1:]
+    return [row for row in rows if row and row[0].strip()]
+
+
+def _write_atomic(csv_file, text):
+    tmp_file = f"{csv_file}.{os.getpid()}.tmp"
+    with open(tmp_file, "w", newline="", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, csv_file)
+
+
+def _csv_text(rows):
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)  # lineterminator \r\n, sama dengan file yang ada
+    return buf.getvalue()
+
+
+def add_events(csv_file, events):
+    """
+    Tambah banyak event (iterable (nama, magnitude)) ke database dalam satu
+    kali tulis. Di dalam lock file dibaca ulang (bisa sudah ditambah analyst
+    lain), duplikat dicek lewat set nama ter-normalisasi (O(1) per event), lalu file baru ditulis ke file
+    sementara dan di-rename (atomik). Baris lama tidak diubah.
+    Return (list event yang ditambahkan, list nama duplikat).
+    """
+    with locked(csv_file):
+        text = _read_text(csv_file)
+        seen = {normalize(row[0]) for row in _read_rows(text)}
+        added, duplicates = [], []
+        for name, magnitude in events:
+            name = name.strip()
+            key = normalize(name)
+            if key in seen:
+                duplicates.append(name)
+                continue
+            seen.add(key)
+            added.append([name, magnitude])
+
+        if added:
+            if not text:
+                text = _csv_text([HEADER])
+            elif not text.endswith("\n"):
+                text += "\r\n"
+            _write_atomic(csv_file, text + _csv_text(added))
+    return added, duplicates
+
+
+def compact(csv_file):
+    """
+    Rapikan database: satu baris per event (key = normalize EventIndex, ejaan
+    pertama dipertahankan seperti nama kanonik EventIndex, magnitude valid
+    terakhir dipakai), diurutkan per nama. Return (jumlah sebelum, sesudah).
+    """
+    with locked(csv_file):
+        rows = _read_rows(_read_text(csv_file))
+        merged = {}  # key -> [nama, magnitude]
+        for row in rows:
+            name = row[0].strip()
+            magnitude = row[1].strip() if len(row) > 1 else ""
+            key = normalize(name)
+            entry = merged.get(key)
+            if entry is None:
+                merged[key] = [name, magnitude]
+            elif magnitude.isdigit():
+                entry[1] = magnitude
+        compacted = sorted(merged.values(), key=lambda r: normalize(r[0]))
+        _write_atomic(csv_file, _csv_text([HEADER] + compacted))
+    return len(rows), len(compacted)
+
+
+def read_import_file(path):
+    """
+    File import vendor → (list (nama, magnitude), list pesan error).
+    CSV: kolom "Event Name"/"name" + "Magnitude" (header opsional, tanpa
+    header = kolom 1 nama, kolom 2 magnitude). JSON: list objek
+    {"event_name"|"Event Name"|"name", "magnitude"} atau {nama: magnitude}.
+    Magnitude harus angka 1–10.
+    """
+    if path.lower().endswith(".json"):
+        with open(path, "r", encoding="utf-8-sig") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            raw = list(data.items())
+        elif isinstance(data, list):
+            raw = []
+            for item in data:
+                if not isinstance(item, dict):
+                    raw.append(None)  # bukan objek
+                    continue
+                lowered = {str(k).strip().lower(): v for k, v in item.items()}
+                name = next((lowered[c] for c in NAME_COLUMNS if c in lowered), "")
+                raw.append((name, lowered.get("magnitude")))
+        else:
+            raise ValueError("JSON harus berupa list objek atau {nama: magnitude}")
+    else:
+        with open(path, "r", newline="", encoding="utf-8-sig") as f:
+            rows = [row for row in csv.reader(f) if row]
+        name_col, mag_col = 0, 1
+        header = [c.strip().lower() for c in rows[0]] if rows else []
+        if "magnitude" in header:
+            mag_col = header.index("magnitude")
+            name_col = next((header.index(c) for c in NAME_COLUMNS if c in header), 0)
+            rows = rows[1:]
+        raw = [(row[name_col] if len(row) > name_col else "", row[mag_col] if len(row) > mag_col else None)
+               for row in rows]
+
+    events, errors = [], []
+    for i, entry in enumerate(raw, 1):
+        if entry is None:
+            errors.append(f"entri {i} dilewati: bukan objek")
+            continue
+        name, magnitude = entry
+        name = str(name or "").strip()
+        try:
+            magnitude = int(str(magnitude).strip())
+        except ValueError:
+            magnitude = None
+        if not name or magnitude is None or not 1 <= magnitude <= 10:
+            errors.append(f"entri {i} dilewati: {name or '(tanpa nama)'} / magnitude {magnitude}")
+            continue
+        events.append((name, magnitude))
+    return events, errors
@@ -0,0 +1,181 @@
+import re
+from itertools import accumulate
+
+_WS_RE = re.compile(r"\s+")
+
+_POPCOUNT = bytes(bin(i).count("1") for i in range(256))
+
+
+
+def normalize(text):
+    if not text:
+        return ""
+    text = text.replace("\xa0", " ")
+    text = text.strip().lower()
+    text = _WS_RE.sub(" ", text)
+    return text
+
+
+class EventIndex:
+    """
+    Index in-memory database event: nama ter-normalisasi →
+    (nama kanonik, magnitude, status FP). Dibangun sekali dari hasil
+    load_event_names, load_event_magnitudes dan load_false_positive,
+    sehingga cek status per event cukup satu lookup dict. fp_rules (FpRuleSet)
+    berisi rule FP per event (IP, port, URL, ...) di luar daftar nama FP.
+    """
+
+    def __init__(self, event_names, mag_map=None, fp_events=None, fp_rules=None):
+        self.names = list(event_names)
+        self.mag_map = dict(mag_map or {})
+        self.fp_events = set(fp_events or ())  # sudah ter-normalisasi
+        self.fp_rules = fp_rules
+
+        norm_mag = {normalize(name): mag for name, mag in self.mag_map.items()}
+        self._entries = {}
+        for name in self.names:
+            key = normalize(name)
+            if key not in self._entries:
+                self._entries[key] = (name, norm_mag.get(key), key in self.fp_events)
+
+        self._unique = None
+        self._lowered = None
+        self._postings = None  # trigram -> [id], dibangun saat suggest pertama
+        self._lcs = None       # LcsBounds semua nama unik, untuk batas atas rasio difflib
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, event_name):
+        return normalize(event_name) in self._entries
+
+    def lookup(self, event_name):
+        """Kembalikan (nama kanonik, magnitude, is_fp) atau None kalau tidak ada."""
+        return self._entries.get(normalize(event_name))
+
+    def canonical(self, event_name):
+        entry = self.lookup(event_name)
+        return entry[0] if entry else None
+
+    # -------------------- SUGGESTION --------------------
+    def _build_trigrams(self):
+        # satu entri per nama unik, supaya saran tidak berisi duplikat
+        self._unique = [entry[0] for entry in self._entries.values()]
+        self._lowered = [name.lower() for name in self._unique]
+        postings = {}
+        for idx, name in enumerate(self._lowered):
+            for gram in set(trigrams(name)):
+                postings.setdefault(gram, []).append(idx)
+        self._postings = postings
+
+    def suggest(self, event_name, limit_substring=5, limit_fuzzy=3, cutoff=0.5):
+        """
+        Saran nama event untuk input yang tidak dikenal.
+        1. Substring match (urutan database), maksimal `limit_substring`.
+        2. Fuzzy match: hasil sama persis dengan difflib.get_close_matches
+           (rasio SequenceMatcher, maksimal `limit_fuzzy` di atas `cutoff`)
+           terhadap semua nama unik. Panjang LCS query ke semua nama dihitung
+           sekaligus (LcsBounds) sebagai batas atas rasio; ratio() yang mahal
+           hanya dihitung untuk kandidat yang batasnya masih bisa masuk top N.
+        """
+        from difflib import SequenceMatcher
+
+        if self._postings is None:
+            self._build_trigrams()
+
+        query = event_name.lower()
+        if len(query) >= 3:
+            # nama yang mengandung query pasti ada di posting list trigram mana pun
+            lists = (self._postings.get(g) for g in set(trigrams(query)))
+            rarest = min(lists, key=lambda ids: len(ids) if ids else 0, default=None) or ()
+            substring_ids = [i for i in rarest if query in self._lowered[i]]
+        else:
+            substring_ids = [i for i, name in enumerate(self._lowered) if query in name]
+        if substring_ids:
+            return [self._unique[i] for i in substring_ids[:limit_substring]]
+
+        if self._lcs is None:
+            self._lcs = LcsBounds(self._lowered)
+        # rasio = 2*M / total panjang, M (blok yang cocok) <= LCS → batas atas
+        size = len(query)
+        bounds = [2.0 * lcs / (length + size)
+                  for lcs, length in zip(self._lcs.lengths(query), self._lcs.name_lengths)]
+        candidates = sorted(((bound, i) for i, bound in enumerate(bounds) if bound >= cutoff), reverse=True)
+
+        matcher = SequenceMatcher()
+        matcher.set_seq2(query)
+        top = []  # (rasio, nama lower, id), urutan sama dengan get_close_matches
+        for bound, i in candidates:
+            if len(top) >= limit_fuzzy and bound < top[-1][0]:
+                break
+            matcher.set_seq1(self._lowered[i])
+            score = matcher.ratio()
+            if score >= cutoff:
+                top.append((score, self._lowered[i], i))
+                top.sort(reverse=True)
+                del top[limit_fuzzy:]
+        return [self._unique[i] for _, _, i in top]
+
+
+def _pack_bits(flags):
+    """Byte 0/1 per bit → integer (little endian); byte 8k+j jadi bit j byte k."""
+    return sum(int.from_bytes(flags[j::8], "little") << j for j in range(8))
+
+
+class LcsBounds:
+    """
+    Panjang LCS satu query terhadap banyak nama sekaligus (bit-parallel LCS,
+    Hyyrö): semua nama dikemas sebagai lane dalam satu integer besar (lane
+    selebar kelipatan 8 bit, minimal satu bit kosong sebagai penahan carry),
+    jadi satu langkah per karakter query berlaku untuk semua nama.
+    """
+
+    def __init__(self, names):
+        self.spans = []  # (byte awal, byte akhir, panjang nama) per lane
+        offset = 0
+        for name in names:
+            nbytes = len(name) // 8 + 1
+            self.spans.append((offset, offset + nbytes, len(name)))
+            offset += nbytes
+        self.nbytes = offset
+        self.name_lengths = [len(name) for name in names]
+
+        # Mask tiap karakter dibangun di C: nama di-pad ke lebar lane (satu
+        # karakter per bit), karakter diganti kode 1..255 per batch, lalu bit
+        # j tiap byte mask diambil dari slice [j::8]. OR integer besar per
+        # karakter nama membuat build O(total panjang nama ^ 2).
+        chars = sorted(set().union(*names))
+        filler = next(chr(code) for code in range(0xE000, 0x110000) if chr(code) not in chars)
+        layout = "".join(name.ljust((end - start) * 8, filler) for name, (start, end, _) in zip(names, self.spans))
+        self.masks = {}
+        for batch_start in range(0, len(chars), 255):
+            batch = chars[batch_start:batch_start + 255]
+            codes = dict.fromkeys(map(ord, chars), 0)
+            codes[ord(filler)] = 0
+            codes.update((ord(char), code) for code, char in enumerate(batch, 1))
+            data = layout.translate(codes).encode("latin-1")
+            for code, char in enumerate(batch, 1):
+                table = bytearray(256)
+                table[code] = 1
+                self.masks[char] = _pack_bits(data.translate(table))
+
+        full = bytearray(offset)
+        for start, _, length in self.spans:
+            full[start:start + (length >> 3)] = b"\xff" * (length >> 3)
+            full[start + (length >> 3)] = (1 << (length & 7)) - 1
+        self.full = int.from_bytes(full, "little")
+
+    def lengths(self, query):
+        full = self.full
+        v = full
+        for char in query:
+            u = v & self.masks.get(char, 0)
+            # v - u tidak pernah meminjam (u subset v); carry v + u berhenti di bit penahan
+            v = ((v + u) | (v - u)) & full
+        # jumlah bit 1 per lane dari prefix sum popcount per byte
+        ones = list(accumulate(v.to_bytes(self.nbytes, "little").translate(_POPCOUNT), initial=0))
+        return [length - ones[end] + ones[start] for start, end, length in self.spans]
+
+
+def trigrams(text):
+    return [text[i:i + 3] for i in range(len(text) - 2)]
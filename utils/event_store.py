@@ -0,0 +1,222 @@
+import os
+import sqlite3
+import time
+from functools import lru_cache
+from datetime import datetime
+
+from parser.event_record import FIELD_INDEX, FIELDS, EventRecord
+from utils import metrics
+from utils.manifest import short_hash
+
+BATCH_SIZE = 5000
+GROUP_COLUMNS = ("event_name", "ticket_id", "event_type", "event_date", "analyst")
+
+_FIELD_LIST = ", ".join(FIELDS)
+SRC_IP = FIELD_INDEX["src_ip"]
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    row_hash TEXT NOT NULL UNIQUE,
+    shift TEXT,
+    source_file TEXT,
+    event_date TEXT,
+    event_hour INTEGER,
+    imported_at TEXT,
+    {", ".join(f"{name} TEXT" for name in FIELDS)}
+);
+CREATE INDEX IF NOT EXISTS idx_events_name ON events (event_name);
+CREATE INDEX IF NOT EXISTS idx_events_ticket ON events (ticket_id);
+CREATE INDEX IF NOT EXISTS idx_events_date ON events (event_date, event_hour);
+
+CREATE TABLE IF NOT EXISTS event_src_ip (
+    row_hash TEXT NOT NULL,
+    src_ip TEXT NOT NULL,
+    PRIMARY KEY (row_hash, src_ip)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_src_ip ON event_src_ip (src_ip);
+"""
+
+
+@lru_cache(maxsize=4096)
+def parse_event_time(tanggal, waktu):
+    """("17/10/2026", "13:45") -> ("2026-10-17", 13); bagian yang tidak valid → None."""
+    try:
+        event_date = datetime.strptime(tanggal.strip(), "%d/%m/%Y").date().isoformat()
+    except ValueError:
+        event_date = None
+    hour = waktu.replace(".", ":").split(":", 1)[0].strip()
+    return event_date, int(hour) if hour.isdigit() and int(hour) < 24 else None
+
+
+def split_lines(raw):
+    """Field multiline (mis. beberapa src_ip) → list nilai, tanpa baris kosong / "-"."""
+    return [x for x in (line.strip() for line in raw.splitlines()) if x and x != "-"]
+
+
+class EventStore:
+    """
+    Database SQLite lokal berisi event hasil parse export IRIS (semua shift)
+    dan offense dari XML QRadar. Insert dilakukan per batch dalam satu
+    transaksi; baris yang sama persis (hash seluruh kolom) tidak disimpan dua
+    kali, jadi export yang sama aman di-import ulang.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA cache_size=-65536")  # 64 MB, index hash acak tetap di memori
+        self.conn.executescript(SCHEMA)
+        self._offense_columns = None
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    # ---------- event IRIS ----------
+    def _insert_events(self, rows, ips):
+        with self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                f"INSERT OR IGNORE INTO events (row_hash, shift, source_file, event_date, event_hour, "
+                f"imported_at, {_FIELD_LIST}) VALUES ({', '.join('?' * (len(FIELDS) + 6))})",
+                rows,
+            )
+            inserted = self.conn.total_changes - before
+            self.conn.executemany("INSERT OR IGNORE INTO event_src_ip (row_hash, src_ip) VALUES (?, ?)", ips)
+        return inserted
+
+    def stage(self, events, shift=None, source_file=None):
+        """Streaming stage: simpan setiap event ke store (per batch), teruskan apa adanya."""
+        imported_at = datetime.now().isoformat(timespec="seconds")
+        field_count = len(FIELDS)
+        rows, ips = [], []
+        inserted = seen = 0
+        elapsed = 0.0
+        try:
+            for e in events:
+                start = time.perf_counter()
+                parts = e.parts
+                values = [value.strip() for value in parts[:field_count]]
+                values.extend([""] * (field_count - len(values)))
+                row_hash = short_hash("\x1f".join(values))
+                event_date, event_hour = parse_event_time(values[9], values[10])
+                rows.append((row_hash, shift, source_file, event_date, event_hour, imported_at, *values))
+                ips.extend((row_hash, ip) for ip in split_lines(values[SRC_IP]))
+                seen += 1
+                if len(rows) >= BATCH_SIZE:
+                    inserted += self._insert_events(rows, ips)
+                    rows, ips = [], []
+                elapsed += time.perf_counter() - start
+                yield e
+        finally:
+            start = time.perf_counter()
+            if rows:
+                inserted += self._insert_events(rows, ips)
+            run = metrics.current
+            run.add_time("store", elapsed + time.perf_counter() - start)
+            run.count("events_stored", inserted)
+            run.count("events_already_stored", seen - inserted)
+
+    # ---------- query ----------
+    @staticmethod
+    def _where(event_name=None, ticket_id=None, src_ip=None, date_from=None, date_to=None, hours=None):
+        clauses, params = [], []
+        if event_name:
+            clauses.append("e.event_name = ?")
+            params.append(event_name)
+        if ticket_id:
+            clauses.append("e.ticket_id = ?")
+            params.append(ticket_id)
+        if src_ip:
+            clauses.append("e.row_hash IN (SELECT row_hash FROM event_src_ip WHERE src_ip = ?)")
+            params.append(src_ip)
+        if date_from:
+            clauses.append("e.event_date >= ?")
+            params.append(date_from)
+        if date_to:
+            clauses.append("e.event_date <= ?")
+            params.append(date_to)
+        if hours:
+            clauses.append("e.event_hour >= ? AND e.event_hour < ?")
+            params.extend(hours)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def iter_events(self, **filters):
+        """Event dari store sebagai EventRecord, bisa langsung dipakai stage report."""
+        where, params = self._where(**filters)
+        cursor = self.conn.execute(
+            f"SELECT {_FIELD_LIST} FROM events e{where} ORDER BY e.event_date, e.event_hour, e.waktu", params)
+        for row in cursor:
+            yield EventRecord(row)
+
+    def query_events(self, limit=50, **filters):
+        where, params = self._where(**filters)
+        return self.conn.execute(
+            f"SELECT e.event_date, e.waktu, e.event_name, e.ticket_id, e.event_type, e.src_ip FROM events e{where} "
+            f"ORDER BY e.event_date DESC, e.event_hour DESC, e.waktu DESC LIMIT ?", params + [limit]).fetchall()
+
+    def count_events(self, group_by=None, limit=20, **filters):
+        """Tanpa group_by → jumlah event; dengan group_by → [(nilai, jumlah)] terbanyak dulu."""
+        where, params = self._where(**filters)
+        if group_by is None:
+            return self.conn.execute(f"SELECT COUNT(*) FROM events e{where}", params).fetchone()[0]
+        if group_by == "src_ip":
+            sql = (f"SELECT i.src_ip, COUNT(*) AS n FROM events e JOIN event_src_ip i ON i.row_hash = e.row_hash"
+                   f"{where} GROUP BY i.src_ip")
+        elif group_by in GROUP_COLUMNS:
+            sql = f"SELECT e.{group_by}, COUNT(*) AS n FROM events e{where} GROUP BY e.{group_by}"
+        else:
+            raise ValueError(f"group_by tidak dikenal: {group_by}")
+        return self.conn.execute(sql + " ORDER BY n DESC LIMIT ?", params + [limit]).fetchall()
+
+    # ---------- offense QRadar ----------
+    def _ensure_offense_table(self, column_names):
+        if self._offense_columns == column_names:
+            return
+        cols = ", ".join(f"{_quote(name)} TEXT" for name in column_names if name != "id")
+        self.conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS offenses (
+                id TEXT PRIMARY KEY, shift TEXT, source_file TEXT, imported_at TEXT, {cols}
+            );
+            CREATE INDEX IF NOT EXISTS idx_offenses_description ON offenses (description);
+        """)
+        self._offense_columns = column_names
+
+    def insert_offenses(self, columns, column_names, shift=None, source_file=None):
+        """columns: {kolom: [nilai]} hasil read_offense_columns. Offense yang sama (id) diperbarui."""
+        self._ensure_offense_table(column_names)
+        meta = (shift, source_file, datetime.now().isoformat(timespec="seconds"))
+        names = [name for name in column_names if name != "id"]
+        rows = ((offense_id, *meta, *values) for offense_id, *values in zip(columns["id"], *(columns[n] for n in names)))
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO offenses (id, shift, source_file, imported_at, "
+                f"{', '.join(_quote(n) for n in names)}) VALUES ({', '.join('?' * (len(names) + 4))})",
+                rows,
+            )
+        metrics.current.count("offenses_stored", len(columns["id"]))
+        return len(columns["id"])
+
+    def query_offenses(self, description=None, limit=50):
+        if self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'offenses'").fetchone() is None:
+            return []
+        where, params = "", []
+        if description:
+            where, params = " WHERE description LIKE ?", [f"%{description}%"]
+        return self.conn.execute(
+            f"SELECT id, magnitude, description, formattedClosedDate, closeUser FROM offenses{where} "
+            f"ORDER BY CAST(id AS INTEGER) DESC LIMIT ?", params + [limit]).fetchall()
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
@@ -0,0 +1,224 @@
+import fnmatch
+import ipaddress
+import re
+from bisect import bisect_right
+from functools import lru_cache
+
+from parser.event_record import FIELD_INDEX, EventRecord
+from utils.event_index import normalize
+from utils.ip_enrich import field_lines, ip_key
+
+# Alias key rule → nama field EventRecord
+KEY_ALIASES = {"src": "src_ip", "dst": "dst_ip", "port": "dst_port"}
+IP_FIELDS = frozenset({"src_ip", "dst_ip"})
+PORT_FIELDS = frozenset({"dst_port"})
+
+_CONDITION_RE = re.compile(r"^\s*(\w+)\s*([=~])\s*(.*?)\s*$")
+
+# Hasil cek per nilai (IP, port, URL) di-cache; nilai yang sama sangat sering berulang
+CHECK_CACHE_SIZE = 65536
+
+
+class IntervalSet:
+    """Gabungan CIDR / range IP sebagai interval integer terurut per family (lookup bisect)."""
+
+    def __init__(self, networks):
+        ranges = {4: [], 6: []}
+        for net in networks:
+            ranges[net.version].append((int(net.network_address), int(net.broadcast_address)))
+        self._families = {}
+        for family, items in ranges.items():
+            items.sort()
+            starts, ends = [], []
+            for start, end in items:
+                if ends and start <= ends[-1] + 1:
+                    ends[-1] = max(ends[-1], end)  # gabung range yang tumpang tindih / bersebelahan
+                else:
+                    starts.append(start)
+                    ends.append(end)
+            self._families[family] = (starts, ends)
+
+    def __contains__(self, ip):
+        key = ip_key(ip)
+        if key is None:
+            return False
+        starts, ends = self._families[key[0]]
+        i = bisect_right(starts, key[1]) - 1
+        return i >= 0 and key[1] <= ends[i]
+
+
+def parse_ports(text):
+    """'80, 443, 8000-8100' → (set port tunggal, [(awal, akhir)])."""
+    single, ranges = set(), []
+    for item in filter(None, (x.strip() for x in text.split(","))):
+        low, sep, high = item.partition("-")
+        if sep:
+            ranges.append((int(low), int(high)))
+        else:
+            single.add(int(item))
+    return frozenset(single), ranges
+
+
+class FpRule:
+    """
+    Satu rule false positive: event (nama / glob) + kondisi field. Kondisi
+    dikompilasi saat load menjadi matcher (set, interval IP, set port, regex
+    gabungan per field). Field multiline (mis. beberapa src_ip) cocok kalau
+    semua nilainya memenuhi kondisi; field kosong tidak pernah cocok.
+    """
+
+    def __init__(self, line_no, text):
+        self.line_no = line_no
+        self.text = text
+        self.label = None
+        self.events = []   # nama event ter-normalisasi
+        self.globs = []    # pola glob / regex (event ~ ...) nama event, dicek sekali per nama
+        exact, ports, cidrs, regexes = {}, {}, {}, {}
+
+        for part in filter(None, (p.strip() for p in text.split(";"))):
+            m = _CONDITION_RE.match(part)
+            if not m:
+                raise ValueError(f"kondisi tidak valid: {part!r}")
+            key, op, value = m.group(1).lower(), m.group(2), m.group(3)
+            key = KEY_ALIASES.get(key, key)
+            if key in ("label", "name"):
+                self.label = value
+            elif key == "event" and op == "~":
+                self.globs.append(re.compile(value, re.IGNORECASE).search)
+            elif key == "event":
+                for pattern in filter(None, (normalize(x) for x in value.split("|"))):
+                    if any(c in pattern for c in "*?["):
+                        self.globs.append(re.compile(fnmatch.translate(pattern)).match)
+                    else:
+                        self.events.append(pattern)
+            elif key not in FIELD_INDEX:
+                raise ValueError(f"field tidak dikenal: {key!r}")
+            elif op == "~":
+                regexes.setdefault(key, []).append(value)
+            elif key in IP_FIELDS:
+                cidrs.setdefault(key, []).extend(
+                    ipaddress.ip_network(x.strip(), strict=False) for x in value.split(",") if x.strip())
+            elif key in PORT_FIELDS:
+                ports.setdefault(key, []).append(value)
+            else:
+                exact.setdefault(key, set()).update(x.strip().lower() for x in value.split(",") if x.strip())
+
+        # urutan cek: yang paling murah dulu
+        self.checks = []
+        for field, values in exact.items():
+            self.checks.append((field, lambda v, values=frozenset(values): v.lower() in values))
+        for field, specs in ports.items():
+            single, ranges = parse_ports(",".join(specs))
+            self.checks.append((field, lru_cache(CHECK_CACHE_SIZE)(
+                lambda v, s=single, r=ranges: _port_match(v, s, r))))
+        for field, networks in cidrs.items():
+            self.checks.append((field, lru_cache(CHECK_CACHE_SIZE)(IntervalSet(networks).__contains__)))
+        for field, patterns in regexes.items():
+            search = re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE).search
+            self.checks.append((field, lru_cache(CHECK_CACHE_SIZE)(lambda v, search=search: search(v) is not None)))
+
+        if not self.checks and not (self.events or self.globs):
+            raise ValueError("rule kosong")
+
+    def describe(self):
+        return self.label or f"rule baris {self.line_no}"
+
+    def name_matches(self, name):
+        """name: nama event ter-normalisasi. Rule tanpa kondisi event berlaku untuk semua nama."""
+        if not (self.events or self.globs):
+            return True
+        return name in self.events or any(match(name) for match in self.globs)
+
+    def matches(self, event):
+        """Cek kondisi field (nama event sudah dicek lewat FpRuleSet.candidates)."""
+        raw_of = event.raw if isinstance(event, EventRecord) else event.get
+        for field, check in self.checks:
+            values = _values(raw_of(field) or "")
+            if not values:
+                return False
+            for value in values:
+                if not check(value):
+                    return False
+        return True
+
+
+def _values(raw):
+    if "\n" not in raw and "<br>" not in raw:
+        raw = raw.strip()
+        return (raw,) if raw and raw != "-" else ()
+    return field_lines(raw)
+
+
+def _port_match(value, single, ranges):
+    if not value.isdigit():
+        return False
+    port = int(value)
+    return port in single or any(low <= port <= high for low, high in ranges)
+
+
+class FpRuleSet:
+    """
+    Kumpulan rule FP dengan index per nama event: rule dengan nama persis
+    masuk dict, pola glob / regex nama dicek sekali per nama event unik, dan
+    daftar kandidat rule per nama di-cache. Event yang namanya tidak punya
+    kandidat (kasus umum) cukup satu lookup dict; kondisi field (interval
+    IP, port, regex gabungan) hanya dijalankan untuk kandidat.
+    """
+
+    def __init__(self, rules=()):
+        self.rules = list(rules)
+        self._by_name = {}
+        self._patterned = []  # rule dengan glob / regex nama event
+        self._any = []
+        for rule in self.rules:
+            for name in rule.events:
+                self._by_name.setdefault(name, []).append(rule)
+            if rule.globs:
+                self._patterned.append(rule)
+            if not rule.events and not rule.globs:
+                self._any.append(rule)
+        self._candidates = {}  # nama event mentah → tuple rule
+
+    def __len__(self):
+        return len(self.rules)
+
+    def candidates(self, event_name):
+        cached = self._candidates.get(event_name)
+        if cached is not None:
+            return cached
+        name = normalize(event_name.strip('"'))
+        found = set(self._by_name.get(name, ()))
+        found.update(rule for rule in self._patterned if rule.name_matches(name))
+        found.update(self._any)
+        cached = self._candidates[event_name] = tuple(sorted(found, key=lambda r: r.line_no))
+        return cached
+
+    def match(self, event):
+        """Rule pertama yang cocok dengan event, atau None."""
+        for rule in self.candidates(event["event_name"]):
+            if rule.matches(event):
+                return rule
+        return None
+
+
+def parse_rules(lines):
+    """Baris file rule → (FpRuleSet, [(nomor baris, pesan error)]). Rule yang tidak valid dilewati."""
+    rules, errors = [], []
+    for line_no, line in enumerate(lines, 1):
+        text = line.strip()
+        if not text or text.startswith("#"):
+            continue
+        try:
+            rules.append(FpRule(line_no, text))
+        except (ValueError, re.error) as exc:
+            errors.append((line_no, str(exc)))
+    return FpRuleSet(rules), errors
+
+
+def load_fp_rules(path):
+    """FpRuleSet dari file rule; file tidak ada → rule set kosong tanpa error."""
+    try:
+        with open(path, "r", encoding="utf-8-sig") as f:
+            return parse_rules(f)
+    except FileNotFoundError:
+        return FpRuleSet(), []
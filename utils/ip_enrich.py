@@ -0,0 +1,146 @@
+import gzip
+import os
+import socket
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+
+from parser.event_record import verticalize
+
+CACHE_SIZE = 65536
+PREFIX_BITS = 16  # index level pertama IPv4: posisi range per prefix /16
+
+_unpack_v4 = struct.Struct("!I").unpack
+
+# Placeholder template yang diisi dari tabel enrichment; country hanya
+# sebagai pengganti kolom export yang kosong
+GEO_PLACEHOLDERS = frozenset({"src_geo", "dst_geo", "src_asn", "dst_asn"})
+PLACEHOLDERS = GEO_PLACEHOLDERS | {"src_country", "dst_country"}
+
+
+def ip_key(text):
+    """'1.2.3.4' → (4, int), IPv6 → (6, int), selain itu None."""
+    text = text.strip()
+    try:
+        if ":" in text:
+            return 6, int.from_bytes(socket.inet_pton(socket.AF_INET6, text), "big")
+        return 4, _unpack_v4(socket.inet_pton(socket.AF_INET, text))[0]
+    except (OSError, ValueError):
+        return None
+
+
+def field_lines(raw):
+    """Field multiline (mentah atau hasil verticalize) → list nilai tanpa <br>, baris kosong dan "-"."""
+    return [x for x in (line.replace("<br>", "").strip() for line in raw.splitlines()) if x and x != "-"]
+
+
+class IpRangeTable:
+    """
+    Tabel range IP offline → (country code, ASN), dari file TSV format ip2asn
+    (range_start, range_end, AS_number, country_code, AS_description; boleh .gz).
+    Range disimpan sebagai array integer terurut (IPv4 di array 'I', IPv6
+    di list int) sehingga lookup cukup satu bisect; untuk IPv4 bisect
+    dibatasi ke range dalam prefix /16 yang sama lewat index prefix. Nilai
+    country/ASN disimpan sekali dan ditunjuk lewat index. Hasil lookup di-cache LRU.
+    """
+
+    def __init__(self, path, cache_size=CACHE_SIZE):
+        self.path = path
+        st = os.stat(path)
+        self.version = f"{st.st_mtime_ns}-{st.st_size}"
+        self.cache_size = cache_size
+        self.values = []  # [(country, asn)], index = info
+        self._ranges = {4: (array("I"), array("I"), array("I")), 6: ([], [], array("I"))}
+        self._prefix = array("I")  # _prefix[p] = index range IPv4 pertama dengan start >= p << shift
+        self._load()
+        self.lookup = lru_cache(maxsize=cache_size)(self._lookup)
+
+    def __getstate__(self):
+        # snapshot (utils.db_cache) berisi array range saja, cache LRU dibuat ulang
+        state = self.__dict__.copy()
+        del state["lookup"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lookup = lru_cache(maxsize=self.cache_size)(self._lookup)
+
+    def __len__(self):
+        return sum(len(starts) for starts, _, _ in self._ranges.values())
+
+    def _load(self):
+        opener = gzip.open if self.path.endswith(".gz") else open
+        value_index = {}
+        rows = {4: [], 6: []}
+        with opener(self.path, "rt", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                cols = line.rstrip("\n").split("\t")
+                if len(cols) < 4:
+                    continue
+                start, end = ip_key(cols[0]), ip_key(cols[1])
+                if start is None or end is None or start[0] != end[0]:
+                    continue
+                country = cols[3].strip()
+                asn = cols[2].strip()
+                if asn == "0" and country in ("None", ""):
+                    continue  # range tanpa data (tidak di-routing)
+                asn = f"AS{asn} {cols[4].strip()}".strip() if len(cols) > 4 else f"AS{asn}"
+                value = (country if country != "None" else "-", asn)
+                info = value_index.get(value)
+                if info is None:
+                    info = value_index[value] = len(self.values)
+                    self.values.append(value)
+                rows[start[0]].append((start[1], end[1], info))
+
+        for family, family_rows in rows.items():
+            family_rows.sort()
+            starts, ends, infos = self._ranges[family]
+            for start, end, info in family_rows:
+                starts.append(start)
+                ends.append(end)
+                infos.append(info)
+
+        starts = self._ranges[4][0]
+        shift = 32 - PREFIX_BITS
+        self._prefix.extend(bisect_left(starts, prefix << shift) for prefix in range((1 << PREFIX_BITS) + 1))
+
+    def _lookup(self, ip):
+        """IP (string) → (country, asn), atau None kalau tidak ada di tabel / bukan IP."""
+        key = ip_key(ip)
+        if key is None:
+            return None
+        family, value = key
+        starts, ends, infos = self._ranges[family]
+        if family == 4:
+            prefix = value >> (32 - PREFIX_BITS)
+            i = bisect_right(starts, value, self._prefix[prefix], self._prefix[prefix + 1]) - 1
+        else:
+            i = bisect_right(starts, value) - 1
+        if i < 0 or value > ends[i]:
+            return None
+        return self.values[infos[i]]
+
+    def placeholders(self, src_raw, dst_raw, src_country="", dst_country=""):
+        """
+        Nilai placeholder enrichment untuk satu event (format vertikal seperti
+        verticalize): {src_geo}, {dst_geo} (country per IP), {src_asn},
+        {dst_asn}; {src_country}/{dst_country} hanya diisi kalau kolom export kosong.
+        """
+        values = {}
+        for side, raw, exported in (("src", src_raw, src_country), ("dst", dst_raw, dst_country)):
+            found = [self.lookup(ip) for ip in field_lines(raw)]
+            countries = [r[0] if r else "-" for r in found]
+            values[f"{side}_geo"] = verticalize("\n".join(countries))
+            values[f"{side}_asn"] = verticalize("\n".join(r[1] if r else "-" for r in found))
+            if not field_lines(exported):
+                values[f"{side}_country"] = values[f"{side}_geo"]
+        return values
+
+
+def table_path(path):
+    """Path tabel yang ada: path itu sendiri atau path + '.gz'; None kalau tidak ada."""
+    for candidate in (path, path + ".gz"):
+        if os.path.exists(candidate):
+            return candidate
+    return None
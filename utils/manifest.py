@@ -0,0 +1,66 @@
+import hashlib
+import json
+import os
+
+
+def short_hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+class RenderManifest:
+    """
+    Manifest file detail event di outputs/shift{n}/.manifest.json.
+    Untuk setiap file output disimpan hash baris input, hash isi template dan
+    versi database (magnitude, tabel IP enrichment) yang dipakai saat render.
+    Run berikutnya hanya me-render file yang salah satu hash-nya berubah, dan
+    hanya menghapus file lama yang tidak muncul lagi.
+    """
+
+    def __init__(self, path, previous=None):
+        """previous → baca manifest lama dari path lain (folder shift aktif saat output dibangun di staging)."""
+        self.path = path
+        self.old = {}
+        self.new = {}
+        try:
+            with open(previous or path, "r", encoding="utf-8") as f:
+                self.old = json.load(f).get("files", {})
+        except (FileNotFoundError, ValueError):
+            pass
+
+    @staticmethod
+    def entry(event_data, template, magnitude, enrichment=None):
+        """enrichment → versi tabel IP enrichment kalau template memakai placeholder-nya."""
+        row = "\x1f".join(f"{key}={value}" for key, value in event_data.items())
+        entry = [short_hash(row), template.digest, str(magnitude)]
+        if enrichment:
+            entry.append(enrichment)
+        return entry
+
+    def is_current(self, file_name, entry):
+        return self.old.get(file_name) == entry
+
+    def record(self, file_name, entry):
+        self.new[file_name] = entry
+
+    def forget(self, file_name):
+        self.new.pop(file_name, None)
+
+    def stale(self):
+        """File yang tercatat di manifest lama tapi tidak dihasilkan run ini."""
+        return self.old.keys() - self.new.keys()
+
+    def remove_stale(self, out_dir):
+        removed = 0
+        for file_name in self.stale():
+            try:
+                os.unlink(os.path.join(out_dir, file_name))
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def save(self):
+        tmp_file = self.path + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump({"files": self.new}, f)
+        os.replace(tmp_file, self.path)
@@ -0,0 +1,110 @@
+import json
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+
+class RunMetrics:
+    """
+    Waktu per stage dan counter untuk satu run mode (parse, cek FP, render,
+    tulis file, export). Ditulis sebagai JSON run report dan opsional sebagai
+    Prometheus textfile, terpisah dari output console untuk manusia.
+    """
+
+    def __init__(self, mode=None, shift=None):
+        self.mode = mode
+        self.shift = shift
+        self.started_at = datetime.now()
+        self._start = time.perf_counter()
+        self.wall_seconds = None
+        self.stages = Counter()    # nama stage -> detik
+        self.counters = Counter()  # nama counter -> nilai
+
+    def add_time(self, stage, seconds):
+        self.stages[stage] += seconds
+
+    def count(self, name, value=1):
+        self.counters[name] += value
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] += time.perf_counter() - start
+
+    def timed_iter(self, iterable, stage):
+        """
+        Bungkus sumber data (generator) dan hitung waktu yang dihabiskan untuk
+        menghasilkan item. Waktu stage lain yang ada di dalam `iterable` ikut
+        terhitung, jadi bungkus sumber mentahnya, bukan pipeline yang sudah jadi.
+        """
+        iterator = iter(iterable)
+        perf_counter = time.perf_counter
+        while True:
+            start = perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.stages[stage] += perf_counter() - start
+                return
+            self.stages[stage] += perf_counter() - start
+            yield item
+
+    def finish(self):
+        self.wall_seconds = time.perf_counter() - self._start
+        return self
+
+    def to_dict(self):
+        return {
+            "mode": self.mode,
+            "shift": self.shift,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "wall_seconds": round(self.wall_seconds or 0.0, 6),
+            "stages": {name: round(sec, 6) for name, sec in self.stages.items()},
+            "counters": dict(self.counters),
+        }
+
+    def write_json(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+    def write_prometheus(self, path, prefix="soc_report"):
+        """Format textfile collector node_exporter; ditulis atomik (tmp + rename)."""
+        labels = f'mode="{self.mode}",shift="{self.shift}"'
+        lines = [
+            f"# HELP {prefix}_wall_seconds Total wall time run terakhir.",
+            f"# TYPE {prefix}_wall_seconds gauge",
+            f"{prefix}_wall_seconds{{{labels}}} {self.wall_seconds or 0.0:.6f}",
+            f"# HELP {prefix}_stage_seconds Wall time per stage pada run terakhir.",
+            f"# TYPE {prefix}_stage_seconds gauge",
+        ]
+        for name, seconds in sorted(self.stages.items()):
+            lines.append(f'{prefix}_stage_seconds{{{labels},stage="{name}"}} {seconds:.6f}')
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            lines.append(f"{prefix}_{name}{{{labels}}} {value}")
+        lines.append(f"{prefix}_last_run_timestamp_seconds{{{labels}}} {self.started_at.timestamp():.0f}")
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, path)
+        return path
+
+
+# Metrics run yang sedang berjalan. Default instance supaya fungsi tetap bisa
+# dipanggil di luar run_mode_* (misalnya dari benchmark) tanpa pengecekan None.
+current = RunMetrics()
+
+
+def start_run(mode, shift=None):
+    global current
+    current = RunMetrics(mode, shift)
+    return current
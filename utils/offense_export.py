@@ -0,0 +1,89 @@
+import csv
+import os
+from importlib.util import find_spec
+
+
+def _rows(columns, column_names):
+    return zip(*(columns[name] for name in column_names))
+
+
+def write_xlsx_stream(columns, column_names, out_file):
+    """
+    Tulis .xlsx dengan mode write-only openpyxl: baris langsung di-stream
+    ke file sehingga memori konstan berapa pun jumlah offense-nya.
+    """
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Sheet1")
+    ws.append(column_names)
+    for row in _rows(columns, column_names):
+        ws.append(row)
+    wb.save(out_file)
+
+
+def write_csv(columns, column_names, out_file):
+    with open(out_file, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        writer.writerow(column_names)
+        writer.writerows(_rows(columns, column_names))
+
+
+def _dataframe(columns, column_names):
+    import pandas as pd
+
+    return pd.DataFrame(columns, columns=column_names)
+
+
+def write_parquet(columns, column_names, out_file):
+    _dataframe(columns, column_names).to_parquet(out_file, index=False)
+
+
+def write_feather(columns, column_names, out_file):
+    _dataframe(columns, column_names).to_feather(out_file)
+
+
+# format -> (ekstensi file, fungsi writer, modul opsional yang dibutuhkan)
+EXPORT_FORMATS = {
+    "xlsx": (".xlsx", write_xlsx_stream, "openpyxl"),
+    "csv": (".csv", write_csv, None),
+    "parquet": (".parquet", write_parquet, "pyarrow"),
+    "feather": (".feather", write_feather, "pyarrow"),
+}
+
+
+class ExportDependencyError(RuntimeError):
+    pass
+
+
+def missing_dependency(fmt):
+    """Nama modul yang dibutuhkan format `fmt` tapi belum terinstall, atau None."""
+    module = EXPORT_FORMATS[fmt][2]
+    if module is not None and find_spec(module) is None:
+        return module
+    return None
+
+
+def dependency_message(fmt, module):
+    return f"format {fmt} membutuhkan {module} (pip install {module})"
+
+
+def export_offenses(columns, column_names, out_base, fmt="xlsx"):
+    """
+    Tulis buffer kolom ke `out_base` + ekstensi format. Return path file.
+    Modul format yang belum terinstall → ExportDependencyError, tanpa
+    meninggalkan file output setengah jadi.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Format export tidak dikenal: {fmt}")
+    ext, writer, module = EXPORT_FORMATS[fmt]
+    if missing_dependency(fmt):
+        raise ExportDependencyError(dependency_message(fmt, module))
+    out_file = f"{out_base}{ext}"
+    try:
+        writer(columns, column_names, out_file)
+    except ImportError as e:
+        if os.path.exists(out_file):
+            os.remove(out_file)
+        raise ExportDependencyError(dependency_message(fmt, module or e.name)) from e
+    return out_file
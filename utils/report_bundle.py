@@ -0,0 +1,100 @@
+import json
+import os
+import zipfile
+
+INDEX_NAME = "index.json"
+
+
+class ReportBundle:
+    """
+    Semua file detail event satu shift dalam satu arsip zip, ditulis
+    berurutan (satu stream) lalu di-rename atomik saat selesai. index.json
+    di dalam arsip memetakan event name / ticket id ke nama file, sehingga
+    report tertentu bisa diambil tanpa extract semuanya.
+
+    Dipakai sebagai context manager: arsip hanya menggantikan bundle lama
+    kalau seluruh input selesai diproses.
+    """
+
+    def __init__(self, path, compresslevel=6):
+        self.path = path
+        self.tmp_path = path + ".tmp"
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._zip = zipfile.ZipFile(self.tmp_path, "w", zipfile.ZIP_DEFLATED, compresslevel=compresslevel)
+        self.files = []  # [{"file", "event_name", "ticket_id", "event_type", "size"}]
+
+    def add(self, file_name, content, event_name="", ticket_id="", event_type=""):
+        """Tambah satu report ke arsip, return ukuran (byte UTF-8) sebelum kompresi."""
+        data = content.encode("utf-8")
+        self._zip.writestr(file_name, data)
+        self.files.append({
+            "file": file_name,
+            "event_name": event_name,
+            "ticket_id": ticket_id,
+            "event_type": event_type,
+            "size": len(data),
+        })
+        return len(data)
+
+    def index(self):
+        by_event = {}
+        by_ticket = {}
+        for entry in self.files:
+            by_event.setdefault(entry["event_name"], []).append(entry["file"])
+            by_ticket.setdefault(entry["ticket_id"], []).append(entry["file"])
+        return {"files": self.files, "by_event": by_event, "by_ticket": by_ticket}
+
+    def close(self):
+        self._zip.writestr(INDEX_NAME, json.dumps(self.index(), ensure_ascii=False, indent=1))
+        self._zip.close()
+        os.replace(self.tmp_path, self.path)
+        return self.path
+
+    def abort(self):
+        self._zip.close()
+        try:
+            os.unlink(self.tmp_path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+def read_bundle_index(path):
+    with zipfile.ZipFile(path) as zf:
+        return json.loads(zf.read(INDEX_NAME).decode("utf-8"))
+
+
+def extract_bundle(path, out_dir, event_name=None, ticket_id=None):
+    """
+    Extract report dari bundle ke out_dir dengan layout yang sama seperti
+    output per file (outputs/shift{n}/<event>_<ticket>_<type>.txt).
+    event_name / ticket_id → hanya report yang cocok. Return list path.
+    """
+    with zipfile.ZipFile(path) as zf:
+        index = json.loads(zf.read(INDEX_NAME).decode("utf-8"))
+        names = [entry["file"] for entry in index["files"]]
+        if event_name is not None:
+            wanted = set(index["by_event"].get(event_name, []))
+            names = [n for n in names if n in wanted]
+        if ticket_id is not None:
+            wanted = set(index["by_ticket"].get(ticket_id, []))
+            names = [n for n in names if n in wanted]
+
+        os.makedirs(out_dir, exist_ok=True)
+        extracted = []
+        for name in names:
+            # nama file dari arsip tidak boleh keluar dari out_dir
+            target = os.path.join(out_dir, os.path.basename(name))
+            with open(target, "wb") as f:
+                f.write(zf.read(name))
+            extracted.append(target)
+    return extracted
@@ -0,0 +1,162 @@
+import glob
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+
+_cleanup_threads = []
+
+# Staging milik proses yang masih hidup tidak disentuh; tanpa info PID
+# (Windows) staging baru dianggap sisa crash kalau tidak diubah selama ini
+STALE_STAGING_SECONDS = 6 * 3600
+
+
+def remove_in_background(paths):
+    """Hapus folder lama di thread terpisah supaya tidak menahan run berikutnya."""
+    paths = [p for p in paths if p]
+    if not paths:
+        return None
+
+    def worker():
+        for path in paths:
+            shutil.rmtree(path, ignore_errors=True)
+
+    # non-daemon: proses tetap menunggu penghapusan selesai sebelum exit
+    thread = threading.Thread(target=worker, name="shift-cleanup")
+    thread.start()
+    _cleanup_threads.append(thread)
+    return thread
+
+
+def wait_background():
+    while _cleanup_threads:
+        _cleanup_threads.pop().join()
+
+
+def pid_alive(pid):
+    """True kalau proses `pid` masih berjalan, None kalau tidak bisa dicek (Windows)."""
+    if os.name == "nt":
+        return None  # os.kill di Windows menghentikan proses, bukan cek
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def staging_owner(path):
+    """PID pembuat folder .shift{n}.staging-<pid>-<stamp>, atau None."""
+    pid = os.path.basename(path).split(".staging-", 1)[-1].split("-", 1)[0]
+    return int(pid) if pid.isdigit() else None
+
+
+def is_stale_staging(path, now=None):
+    """Staging sisa run yang crash: pemiliknya sudah mati, atau lama tidak diubah."""
+    pid = staging_owner(path)
+    alive = pid_alive(pid) if pid is not None and pid != os.getpid() else None
+    if alive is not None:
+        return not alive
+    try:
+        return (now or time.time()) - os.path.getmtime(path) > STALE_STAGING_SECONDS
+    except OSError:
+        return False
+
+
+def link_or_copy(src, dst):
+    """Hardlink file dari generasi sebelumnya (fallback copy kalau FS tidak mendukung)."""
+    try:
+        os.link(src, dst)
+    except FileNotFoundError:
+        return False
+    except OSError:
+        shutil.copy2(src, dst)
+    return True
+
+
+class ShiftGeneration:
+    """
+    Output satu run mode 1/2 dibangun di folder staging
+    (outputs/.shift{n}.staging-*) lalu di-swap dengan rename saat selesai:
+
+        outputs/shift{n}            → outputs/.shift{n}.gen-<timestamp>  (generasi lama)
+        outputs/.shift{n}.staging-* → outputs/shift{n}
+
+    Kalau run gagal, staging dibuang dan folder shift lama tetap utuh.
+    Generasi lama disimpan sebanyak `retention`, sisanya dihapus di background.
+    """
+
+    def __init__(self, output_dir, shift_key, retention=0):
+        self.output_dir = output_dir
+        self.shift_key = shift_key
+        self.retention = retention
+        self.live_dir = os.path.join(output_dir, f"shift{shift_key}")
+        self.staging_dir = None
+        self.committed = False
+
+    def _generations(self):
+        return sorted(glob.glob(os.path.join(self.output_dir, f".shift{self.shift_key}.gen-*")))
+
+    def recover(self):
+        """Swap yang terputus di antara dua rename: kembalikan generasi terakhir."""
+        generations = self._generations()
+        if not os.path.isdir(self.live_dir) and generations:
+            os.rename(generations[-1], self.live_dir)
+
+    def open(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.recover()
+        # sisa staging dari run yang crash / dibatalkan; staging proses lain yang
+        # sedang membangun shift yang sama dibiarkan
+        leftovers = glob.glob(os.path.join(self.output_dir, f".shift{self.shift_key}.staging-*"))
+        remove_in_background([path for path in leftovers if is_stale_staging(path)])
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        self.staging_dir = os.path.join(self.output_dir, f".shift{self.shift_key}.staging-{os.getpid()}-{stamp}")
+        os.makedirs(self.staging_dir)
+        return self
+
+    def previous(self, name):
+        """Path file di generasi aktif (sebelum swap)."""
+        return os.path.join(self.live_dir, name)
+
+    def carry_over(self, names):
+        """
+        Copy file kecil (WA, statistik, state watch) dari folder shift aktif ke
+        staging. Sengaja copy, bukan hardlink, karena file ini ditulis ulang di
+        tempat oleh run berikutnya dan tidak boleh ikut mengubah generasi lama.
+        """
+        carried = 0
+        for name in names:
+            try:
+                shutil.copy2(self.previous(name), os.path.join(self.staging_dir, name))
+                carried += 1
+            except FileNotFoundError:
+                pass
+        return carried
+
+    def commit(self):
+        if os.path.isdir(self.live_dir):
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+            os.rename(self.live_dir, os.path.join(self.output_dir, f".shift{self.shift_key}.gen-{stamp}"))
+        os.rename(self.staging_dir, self.live_dir)
+        self.committed = True
+
+        generations = self._generations()
+        expired = generations[:-self.retention] if self.retention > 0 else generations
+        remove_in_background(expired)
+        return self.live_dir
+
+    def discard(self):
+        remove_in_background([self.staging_dir])
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+        return False
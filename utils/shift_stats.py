@@ -0,0 +1,203 @@
+import json
+import os
+import time
+from collections import Counter
+from itertools import chain
+from datetime import datetime
+
+from parser.event_record import FIELD_INDEX
+from utils import metrics
+
+UNKNOWN_HOUR = "unknown"
+SEVERITY_ORDER = ("High", "Medium", "Low", "Unknown")
+
+
+def hour_bucket(tanggal, waktu):
+    """("17/10/2026", "13:45") -> "2026-10-17 13:00" (bisa diurutkan sebagai string)."""
+    hour = waktu.replace(".", ":").split(":", 1)[0].strip()
+    if not hour.isdigit() or int(hour) > 23:
+        return UNKNOWN_HOUR
+    try:
+        day = datetime.strptime(tanggal.strip(), "%d/%m/%Y").date().isoformat()
+    except ValueError:
+        day = tanggal.strip() or "-"
+    return f"{day} {int(hour):02d}:00"
+
+
+class ShiftStats:
+    """
+    Statistik shift untuk WA report: top source IP, source country,
+    destination port, breakdown severity dan histogram event per jam.
+
+    Baris mentah dikumpulkan per batch lalu dihitung per kolom sekaligus
+    (Counter.update atas satu kolom batch), bukan satu update Counter per
+    event; top-N menghitung event, bukan baris field multiline. Severity
+    dan jam dihitung per pasangan unik (event_name, magnitude) /
+    (tanggal, waktu) di batch, jadi categorize/strptime hanya jalan untuk
+    nilai yang berbeda. Semua key berupa string sehingga state bisa disimpan
+    ke JSON dan dilanjutkan (mode watch).
+    """
+
+    def __init__(self, mag_map=None, categorize=None, top_n=5, batch_size=10000):
+        self.mag_map = mag_map or {}
+        self.categorize = categorize
+        self.top_n = top_n
+        self.batch_size = batch_size
+        self.total = 0
+        self.src_ip = Counter()
+        self.src_country = Counter()
+        self.dst_port = Counter()
+        self.severity = Counter()
+        self.hourly = Counter()
+        self._severity_cache = {}
+        self._hour_cache = {}
+        self._reset_batch()
+
+    def _reset_batch(self):
+        self._rows = []
+
+    # ---------- akumulasi ----------
+    def stage(self, events):
+        """Streaming stage: simpan baris mentah per batch, teruskan event apa adanya."""
+        elapsed = 0.0
+        try:
+            for e in events:
+                self._rows.append(e.parts)
+                if len(self._rows) >= self.batch_size:
+                    start = time.perf_counter()
+                    self.flush()
+                    elapsed += time.perf_counter() - start
+                yield e
+        finally:
+            start = time.perf_counter()
+            self.flush()
+            metrics.current.add_time("stats", elapsed + time.perf_counter() - start)
+
+    def _column(self, name):
+        idx = FIELD_INDEX[name]
+        return [row[idx] if len(row) > idx else "" for row in self._rows]
+
+    def _count_lines(self, counter, name):
+        """
+        Field multiline: tiap event dihitung sekali per nilai berbeda, jadi
+        angka top-N tetap jumlah event meski satu event berisi beberapa baris
+        IP / country / port. Nilai satu baris (mayoritas) dihitung sekaligus.
+        """
+        values = self._column(name)
+        multiline = [value for value in values if "\n" in value or "\r" in value]
+        if multiline:
+            values = [value for value in values if "\n" not in value and "\r" not in value]
+            counter.update(chain.from_iterable({line.strip() for line in value.splitlines()} for value in multiline))
+        counter.update(map(str.strip, values))
+        for junk in ("", "-"):
+            counter.pop(junk, None)
+
+    def flush(self):
+        if not self._rows:
+            return
+        self.total += len(self._rows)
+        self._count_lines(self.src_ip, "src_ip")
+        self._count_lines(self.src_country, "src_country")
+        self._count_lines(self.dst_port, "dst_port")
+
+        names = map(str.strip, self._column("event_name"))
+        magnitudes = map(str.strip, self._column("magnitude"))
+        for pair, count in Counter(zip(names, magnitudes)).items():
+            self.severity[self._severity_of(pair)] += count
+
+        dates = map(str.strip, self._column("tanggal"))
+        times = map(str.strip, self._column("waktu"))
+        for pair, count in Counter(zip(dates, times)).items():
+            bucket = self._hour_cache.get(pair)
+            if bucket is None:
+                bucket = self._hour_cache[pair] = hour_bucket(*pair)
+            self.hourly[bucket] += count
+        self._reset_batch()
+
+    def _severity_of(self, pair):
+        severity = self._severity_cache.get(pair)
+        if severity is None:
+            event_name, raw_magnitude = pair
+            magnitude = self.mag_map.get(event_name)
+            if magnitude is None:
+                try:
+                    magnitude = int(raw_magnitude)
+                except ValueError:
+                    magnitude = None
+            if magnitude is None or self.categorize is None:
+                severity = "Unknown"
+            else:
+                severity = self.categorize(magnitude)
+            self._severity_cache[pair] = severity
+        return severity
+
+    # ---------- output ----------
+    def _top_lines(self, counter):
+        top = counter.most_common(self.top_n)
+        return "\n".join(f"{i}. {value} ({count} events)" for i, (value, count) in enumerate(top, 1)) or "-"
+
+    def placeholders(self):
+        """Nilai placeholder tambahan untuk templates/wa.txt."""
+        severity = "\n".join(f"{name}: {self.severity[name]} events"
+                             for name in SEVERITY_ORDER if self.severity.get(name)) or "-"
+        hourly = []
+        for bucket, count in sorted(self.hourly.items()):
+            if bucket == UNKNOWN_HOUR:
+                continue
+            day, hour = bucket.split(" ")
+            try:
+                day = datetime.strptime(day, "%Y-%m-%d").strftime("%d/%m/%Y")
+            except ValueError:
+                pass
+            hourly.append(f"{day} {hour} : {count} events")
+        if self.hourly.get(UNKNOWN_HOUR):
+            hourly.append(f"Tanpa waktu : {self.hourly[UNKNOWN_HOUR]} events")
+
+        return {
+            "total_events": str(self.total),
+            "top_src_ip": self._top_lines(self.src_ip),
+            "top_src_country": self._top_lines(self.src_country),
+            "top_dst_port": self._top_lines(self.dst_port),
+            "severity": severity,
+            "hourly": "\n".join(hourly) or "-",
+        }
+
+    def _top(self, counter):
+        return [{"value": value, "count": count} for value, count in counter.most_common(self.top_n)]
+
+    def to_dict(self):
+        """Ringkasan machine-readable (top-N, severity, histogram per jam)."""
+        return {
+            "total_events": self.total,
+            "top_src_ip": self._top(self.src_ip),
+            "top_src_country": self._top(self.src_country),
+            "top_dst_port": self._top(self.dst_port),
+            "unique_src_ip": len(self.src_ip),
+            "severity": {name: self.severity[name] for name in SEVERITY_ORDER if self.severity.get(name)},
+            "hourly": dict(sorted(self.hourly.items())),
+        }
+
+    def write_summary(self, path, **meta):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({**meta, **self.to_dict()}, f, indent=2)
+        os.replace(tmp_path, path)
+        return path
+
+    # ---------- state (mode watch) ----------
+    def state(self):
+        return {
+            "total": self.total,
+            "src_ip": dict(self.src_ip),
+            "src_country": dict(self.src_country),
+            "dst_port": dict(self.dst_port),
+            "severity": dict(self.severity),
+            "hourly": dict(self.hourly),
+        }
+
+    def load_state(self, state):
+        self.total = state.get("total", 0)
+        for name in ("src_ip", "src_country", "dst_port", "severity", "hourly"):
+            getattr(self, name).update(state.get(name, {}))
+        return self
@@ -0,0 +1,79 @@
+import hashlib
+import os
+import re
+from functools import lru_cache
+
+PLACEHOLDER_RE = re.compile(r"\{(\w+)\}")
+_MISSING = object()
+
+
+class CompiledTemplate:
+    """
+    Template yang sudah dipecah menjadi segmen literal dan placeholder.
+    Render cukup satu kali jalan (join), bukan str.replace per key.
+    """
+    __slots__ = ("literals", "names", "digest")
+
+    def __init__(self, text):
+        self.digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+        parts = PLACEHOLDER_RE.split(text)
+        self.literals = parts[0::2]
+        self.names = parts[1::2]
+
+    def render(self, values, extra=None):
+        """
+        Isi placeholder dari `extra` lalu `values`.
+        Placeholder yang tidak punya nilai dibiarkan apa adanya ("{nama}").
+        """
+        out = [self.literals[0]]
+        for name, literal in zip(self.names, self.literals[1:]):
+            value = _MISSING
+            if extra:
+                value = extra.get(name, _MISSING)
+            if value is _MISSING:
+                value = values.get(name, _MISSING)
+            out.append("{" + name + "}" if value is _MISSING else str(value))
+            out.append(literal)
+        return "".join(out)
+
+
+@lru_cache(maxsize=256)
+def compile_template(text):
+    return CompiledTemplate(text)
+
+
+class TemplateCache:
+    """
+    Cache template per file di folder templates/.
+    File hanya dibaca ulang kalau mtime/size berubah.
+    """
+
+    def __init__(self, template_dir):
+        self.template_dir = template_dir
+        self._entries = {}  # path -> ((mtime_ns, size), CompiledTemplate)
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, name):
+        return os.path.join(self.template_dir, f"{name}.txt")
+
+    def get(self, name):
+        """Kembalikan CompiledTemplate, atau None kalau file template tidak ada."""
+        path = self.path_for(name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            self._entries.pop(path, None)
+            return None
+
+        stamp = (st.st_mtime_ns, st.st_size)
+        entry = self._entries.get(path)
+        if entry and entry[0] == stamp:
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        with open(path, "r", encoding="utf-8") as f:
+            compiled = compile_template(f.read())
+        self._entries[path] = (stamp, compiled)
+        return compiled
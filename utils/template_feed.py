@@ -0,0 +1,54 @@
+import csv
+import json
+
+# Nama kolom / key yang diterima di feed signature vendor → field template
+COLUMN_ALIASES = {
+    "event name": "event_name", "event_name": "event_name", "name": "event_name", "signature": "event_name",
+    "deskripsi": "deskripsi", "description": "deskripsi",
+    "mitigasi": "mitigasi", "mitigation": "mitigasi", "solution": "mitigasi",
+}
+FEED_FIELDS = ("event_name", "deskripsi", "mitigasi")
+
+
+def _record(item):
+    record = dict.fromkeys(FEED_FIELDS, "")
+    for key, value in item.items():
+        field = COLUMN_ALIASES.get(str(key).strip().lower())
+        if field is not None and value is not None:
+            record[field] = str(value).strip()
+    return record
+
+
+def read_template_feed(path):
+    """
+    File feed signature → (list {event_name, deskripsi, mitigasi}, list pesan error).
+    Format: CSV dengan header (Event Name / name, Deskripsi / description,
+    Mitigasi / mitigation; field multiline memakai kutip CSV), JSON list
+    objek, atau JSON Lines (.jsonl, satu objek per baris). Record tanpa nama
+    event atau tanpa deskripsi dan mitigasi sama sekali dilewati.
+    """
+    lower = path.lower()
+    with open(path, "r", newline="", encoding="utf-8-sig") as f:
+        if lower.endswith(".jsonl"):
+            items = [json.loads(line) for line in f if line.strip()]
+        elif lower.endswith(".json"):
+            items = json.load(f)
+        else:
+            reader = csv.DictReader(f)
+            if not any(COLUMN_ALIASES.get((c or "").strip().lower()) == "event_name" for c in reader.fieldnames or ()):
+                raise ValueError("header CSV harus punya kolom 'Event Name' / 'name'")
+            items = list(reader)
+
+    records, errors = [], []
+    for i, item in enumerate(items, 1):
+        if not isinstance(item, dict):
+            errors.append(f"record {i} dilewati: bukan objek")
+            continue
+        record = _record(item)
+        if not record["event_name"]:
+            errors.append(f"record {i} dilewati: nama event kosong")
+        elif not (record["deskripsi"] or record["mitigasi"]):
+            errors.append(f"record {i} dilewati: '{record['event_name']}' tanpa deskripsi dan mitigasi")
+        else:
+            records.append(record)
+    return records, errors